@@ -0,0 +1,63 @@
+import json
+import mimetypes
+import os
+
+from flask import abort, request, send_file
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BASE_DIR, "static", "src")
+DIST_DIR = os.path.join(BASE_DIR, "static", "dist")
+MANIFEST = os.path.join(DIST_DIR, "manifest.json")
+
+# Sin compilar (python3 build_assets.py) se usan los CDN, como antes
+DEV_HEAD = """    <!-- Tailwind CSS -->
+    <script src="https://cdn.tailwindcss.com"></script>
+    <!-- Vue 3 -->
+    <script src="https://unpkg.com/vue@3/dist/vue.global.js"></script>
+    <link rel="stylesheet" href="/static/src/app.css">
+"""
+DEV_BODY = """<script src="/static/src/app.js"></script>
+"""
+
+# Orden de preferencia de las versiones precomprimidas
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE = 365 * 24 * 3600
+
+
+def load_manifest():
+    """nombre lógico -> fichero con hash, o None si no se han compilado los assets"""
+    if not os.path.exists(MANIFEST):
+        return None
+    with open(MANIFEST, "r") as f:
+        return json.load(f)
+
+
+def render_dev_index():
+    with open(os.path.join(SRC_DIR, "index.html"), "r") as f:
+        page = f.read()
+    return page.replace("    <!-- assets:head -->\n", DEV_HEAD).replace("<!-- assets:body -->\n", DEV_BODY)
+
+
+def send_dist(filename, max_age):
+    """Sirve un fichero de static/dist eligiendo la versión .br/.gz precomprimida
+    según Accept-Encoding, con ETag y Cache-Control"""
+    path = os.path.join(DIST_DIR, filename)
+    if os.path.dirname(os.path.normpath(path)) != DIST_DIR or not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    encoding = None
+    for name, suffix in ENCODINGS:
+        if name in request.accept_encodings and os.path.isfile(path + suffix):
+            path, encoding = path + suffix, name
+            break
+    stat = os.stat(path)
+    etag = f"{filename}-{encoding or 'identity'}-{int(stat.st_mtime)}-{stat.st_size}"
+    response = send_file(path, mimetype=mimetype, etag=etag, conditional=True, max_age=max_age)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    if max_age == IMMUTABLE:
+        response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE}, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
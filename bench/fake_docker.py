@@ -0,0 +1,424 @@
+"""Daemon de Docker falso que habla la Engine API sobre un socket unix.
+
+Sirve para medir J5Dock a escala sin un host Docker real:
+
+    python3 bench/fake_docker.py --socket /tmp/fake-docker.sock --containers 500
+    DOCKER_HOST=unix:///tmp/fake-docker.sock python3 main.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+API_VERSION = "1.45"
+
+
+def _timestamp(now):
+    """Hora en el formato del daemon, con nanosegundos"""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now)) + f".{int(now % 1 * 1e9):09d}Z"
+
+
+class FakeEngine:
+    """Estado simulado: contenedores, latencias y suscriptores de eventos"""
+
+    def __init__(self, containers=100, latency=0.0, stop_delay=0.0, running_ratio=0.5):
+        self.latency = latency
+        self.stop_delay = stop_delay
+        self.lock = threading.Lock()
+        self.containers = {}
+        self.subscribers = []
+        self.calls = 0
+        self.logs = {}          # id -> [(timestamp, línea)]
+        self.log_followers = {}  # id -> [cola]
+        self.stats_interval = 1.0
+        self.load = {}  # id -> factor de CPU/red de sus stats (1 por defecto)
+        self.df_delay = 0.0  # lo que tarda /system/df (en un host real, segundos o minutos)
+        for i in range(containers):
+            self.create(f"c{i:05d}", running=i < containers * running_ratio,
+                        volume=f"data{i % 10}" if i % 3 == 0 else None)
+
+    def create(self, name, running=False, health_delay=None, volume=None):
+        """health_delay: segundos hasta que el healthcheck pasa a healthy (None = sin healthcheck)"""
+        cid = hashlib.sha256(name.encode()).hexdigest()
+        mounts = [{"Type": "bind", "Source": f"/srv/{name}", "Destination": "/app", "RW": True}]
+        if volume:
+            mounts.append({"Type": "volume", "Name": volume, "Source": f"/var/lib/docker/volumes/{volume}/_data",
+                           "Destination": "/data", "RW": True})
+        self.containers[cid] = {
+            "Id": cid,
+            "Names": [f"/{name}"],
+            "Image": "alpine:latest",
+            "State": "running" if running else "exited",
+            "Status": "Up" if running else "Exited (0)",
+            "Created": int(time.time()),
+            "Mounts": mounts,
+            "HealthDelay": health_delay,
+            "Health": None,
+            "StartedAt": _timestamp(time.time()) if running else "0001-01-01T00:00:00Z",
+        }
+        if running and health_delay is not None:
+            self.containers[cid]["Status"] = "Up (healthy)"
+            self.containers[cid]["Health"] = "healthy"
+        return cid
+
+    def find(self, ref):
+        ref = ref.lstrip("/")
+        if ref in self.containers:
+            return self.containers[ref]
+        for c in self.containers.values():
+            if c["Names"][0] == f"/{ref}" or c["Id"].startswith(ref):
+                return c
+        return None
+
+    def emit(self, container, action):
+        event = {
+            "Type": "container",
+            "Action": action,
+            "status": action,
+            "id": container["Id"],
+            "Actor": {"ID": container["Id"], "Attributes": {"name": container["Names"][0][1:]}},
+            "time": int(time.time()),
+            "timeNano": time.time_ns(),
+        }
+        for q in list(self.subscribers):
+            q.put(event)
+
+    def log(self, container, text):
+        """Añade una línea al log del contenedor y la envía a quien lo siga"""
+        now = time.time()
+        ts = _timestamp(now)
+        with self.lock:
+            self.logs.setdefault(container["Id"], []).append((now, f"{ts} {text}"))
+            followers = list(self.log_followers.get(container["Id"], []))
+        for q in followers:
+            q.put(f"{ts} {text}")
+
+    def set_state(self, container, state, action):
+        container["State"] = state
+        if action in ("start", "restart"):
+            container["StartedAt"] = _timestamp(time.time())
+        if state not in ("running", "paused"):
+            container["Health"] = None
+        # Como Docker: pause/unpause conservan la salud y no mandan health_status
+        health = f" ({container['Health']})" if container["Health"] else ""
+        container["Status"] = {"running": f"Up{health}", "paused": "Up (Paused)"}.get(state, "Exited (0)")
+        self.emit(container, action)
+        delay = container.get("HealthDelay")
+        if state == "running" and action == "start" and delay is not None:
+            container["Status"] = "Up (health: starting)"
+            container["Health"] = "starting"
+            self.emit(container, "health_status: starting")
+            threading.Timer(delay, self._healthy, args=(container,)).start()
+
+    def _healthy(self, container):
+        if container["State"] == "running":
+            container["Status"] = "Up (healthy)"
+            container["Health"] = "healthy"
+            self.emit(container, "health_status: healthy")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def engine(self):
+        return self.server.engine
+
+    def address_string(self):
+        return "unix"
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Api-Version", API_VERSION)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status=204):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def start_chunked(self, content_type="application/json"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def route(self, method):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts and parts[0].startswith("v1."):
+            parts = parts[1:]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        with self.engine.lock:
+            self.engine.calls += 1
+        if self.engine.latency:
+            time.sleep(self.engine.latency)
+        handler = getattr(self, f"{method}_{parts[0] if parts else ''}", None)
+        if handler is None:
+            return self.send_json({"message": "page not found"}, 404)
+        return handler(parts[1:], query)
+
+    def do_GET(self):
+        self.route("get")
+
+    def do_POST(self):
+        self.route("post")
+
+    def do_HEAD(self):
+        self.route("get")
+
+    def get__ping(self, parts, query):
+        body = b"OK"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Api-Version", API_VERSION)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_version(self, parts, query):
+        self.send_json({"Version": "fake", "ApiVersion": API_VERSION, "MinAPIVersion": "1.24"})
+
+    def get_containers(self, parts, query):
+        engine = self.engine
+        if parts and parts[0] == "json":
+            filters = json.loads(query.get("filters", "{}"))
+            with engine.lock:
+                items = list(engine.containers.values())
+            if "id" in filters:
+                wanted = list(filters["id"])
+                items = [c for c in items if any(c["Id"].startswith(w) for w in wanted)]
+            if "name" in filters:
+                wanted = list(filters["name"])
+                items = [c for c in items if any(w in c["Names"][0] for w in wanted)]
+            if "status" in filters:
+                wanted = list(filters["status"])
+                items = [c for c in items if c["State"] in wanted]
+            if query.get("all") not in ("1", "true", "True"):
+                items = [c for c in items if c["State"] == "running"]
+            return self.send_json([{k: v for k, v in c.items() if k not in ("HealthDelay", "Health", "StartedAt")} for c in items])
+        container = engine.find(parts[0]) if parts else None
+        if container is None:
+            return self.send_json({"message": f"No such container: {parts[0] if parts else ''}"}, 404)
+        action = parts[1] if len(parts) > 1 else ""
+        if action == "json":
+            return self.send_json(self.inspect(container))
+        if action == "logs":
+            return self.container_logs(container, query)
+        if action == "stats":
+            return self.stats(container, query.get("stream") not in ("0", "false", "False"))
+        return self.send_json({"message": "page not found"}, 404)
+
+    def inspect(self, container):
+        return {
+            "Id": container["Id"],
+            "Name": container["Names"][0],
+            "Image": container["Image"],
+            "State": {
+                "Status": container["State"],
+                "Running": container["State"] in ("running", "paused"),
+                "Paused": container["State"] == "paused",
+                "StartedAt": container["StartedAt"],
+                **({"Health": {"Status": container["Health"]}} if container["Health"] else {}),
+            },
+            "Config": {
+                "Image": container["Image"],
+                "Labels": {},
+                "Tty": False,
+                "Healthcheck": {"Test": ["CMD", "true"]} if container.get("HealthDelay") is not None else None,
+            },
+            "Mounts": container["Mounts"],
+        }
+
+    @staticmethod
+    def frame(line):
+        # Formato multiplexado de /logs sin TTY: cabecera de 8 bytes (stdout = 1)
+        data = line.encode() + b"\n"
+        return b"\x01\x00\x00\x00" + len(data).to_bytes(4, "big") + data
+
+    def container_logs(self, container, query):
+        engine = self.engine
+        with engine.lock:
+            lines = list(engine.logs.get(container["Id"], []))
+        since = float(query.get("since", 0) or 0)
+        lines = [line for t, line in lines if t >= since]
+        tail = query.get("tail", "all")
+        if tail != "all":
+            lines = lines[len(lines) - int(tail):] if int(tail) else []
+        follow = query.get("follow") in ("1", "true", "True")
+        if not follow:
+            body = b"".join(self.frame(line) for line in lines)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            return self.wfile.write(body)
+        q = queue.Queue()
+        with engine.lock:
+            engine.log_followers.setdefault(container["Id"], []).append(q)
+        try:
+            self.start_chunked("application/vnd.docker.raw-stream")
+            for line in lines:
+                self.write_chunk(self.frame(line))
+            while container["State"] == "running":
+                try:
+                    self.write_chunk(self.frame(q.get(timeout=0.5)))
+                except queue.Empty:
+                    continue
+            self.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with engine.lock:
+                engine.log_followers[container["Id"]].remove(q)
+
+    def stats(self, container, stream):
+        # Contadores que crecen de forma estable: ~25% de una CPU y 1 KB/s de red
+        # por defecto; FakeEngine.load[id] = 0 simula un contenedor inactivo
+        load = self.engine.load.get(container["Id"], 1.0)
+
+        def sample(n):
+            return {
+                "read": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "cpu_stats": {"cpu_usage": {"total_usage": int((n + 1) * 250_000_000 * load)}, "system_cpu_usage": (n + 1) * 1_000_000_000, "online_cpus": 1},
+                "precpu_stats": {"cpu_usage": {"total_usage": int(n * 250_000_000 * load)}, "system_cpu_usage": n * 1_000_000_000, "online_cpus": 1},
+                "memory_stats": {"usage": 64 << 20, "limit": 1 << 30, "stats": {"inactive_file": 4 << 20}},
+                "networks": {"eth0": {"rx_bytes": int(n * 1024 * load), "tx_bytes": int(n * 512 * load)}},
+            }
+        if not stream:
+            return self.send_json(sample(0))
+        try:
+            self.start_chunked()
+            n = 0
+            while container["State"] == "running":
+                self.write_chunk(json.dumps(sample(n)).encode() + b"\n")
+                n += 1
+                time.sleep(self.engine.stats_interval)
+            self.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def post_containers(self, parts, query):
+        engine = self.engine
+        container = engine.find(parts[0]) if parts else None
+        if container is None:
+            return self.send_json({"message": f"No such container: {parts[0] if parts else ''}"}, 404)
+        action = parts[1] if len(parts) > 1 else ""
+        if action == "start":
+            if container["State"] == "running":
+                return self.send_empty(304)
+            engine.set_state(container, "running", "start")
+        elif action == "stop":
+            if container["State"] not in ("running", "paused"):
+                return self.send_empty(304)
+            if engine.stop_delay:
+                time.sleep(engine.stop_delay)
+            engine.emit(container, "kill")
+            engine.set_state(container, "exited", "die")
+            engine.emit(container, "stop")
+        elif action == "restart":
+            if engine.stop_delay:
+                time.sleep(engine.stop_delay)
+            engine.set_state(container, "exited", "die")
+            engine.set_state(container, "running", "start")
+            engine.emit(container, "restart")
+        elif action == "pause":
+            if container["State"] != "running":
+                return self.send_json({"message": "Container is not running"}, 409)
+            engine.set_state(container, "paused", "pause")
+        elif action == "unpause":
+            if container["State"] != "paused":
+                return self.send_json({"message": "Container is not paused"}, 409)
+            engine.set_state(container, "running", "unpause")
+        else:
+            return self.send_json({"message": "page not found"}, 404)
+        return self.send_empty()
+
+    def get_system(self, parts, query):
+        if parts != ["df"]:
+            return self.send_json({"message": "page not found"}, 404)
+        engine = self.engine
+        time.sleep(engine.df_delay)
+        with engine.lock:
+            items = list(engine.containers.values())
+        # Tamaños deterministas a partir del id, para poder comprobarlos
+        image_id = "sha256:" + hashlib.sha256(b"alpine:latest").hexdigest()
+        volumes = sorted({m["Name"] for c in items for m in c["Mounts"] if m["Type"] == "volume"})
+        self.send_json({
+            "LayersSize": 7_800_000,
+            "Images": [{"Id": image_id, "RepoTags": ["alpine:latest"], "Size": 7_800_000, "SharedSize": -1,
+                        "Containers": len(items)}],
+            "Containers": [{
+                "Id": c["Id"], "Names": c["Names"], "Image": c["Image"], "ImageID": image_id,
+                "State": c["State"], "Mounts": c["Mounts"],
+                "SizeRw": int(c["Id"][:4], 16) * 1024, "SizeRootFs": int(c["Id"][:4], 16) * 1024 + 7_800_000,
+            } for c in items],
+            "Volumes": [{"Name": v, "Mountpoint": f"/var/lib/docker/volumes/{v}/_data",
+                         "UsageData": {"Size": (i + 1) * 1_000_000, "RefCount": 1}} for i, v in enumerate(volumes)],
+            "BuildCache": [],
+        })
+
+    def get_events(self, parts, query):
+        q = queue.Queue()
+        self.engine.subscribers.append(q)
+        try:
+            self.start_chunked()
+            while True:
+                try:
+                    event = q.get(timeout=1)
+                except queue.Empty:
+                    continue
+                self.write_chunk(json.dumps(event).encode() + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.engine.subscribers.remove(q)
+
+
+class FakeDockerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, engine):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.engine = engine
+        super().__init__(socket_path, Handler)
+
+
+def serve_in_thread(socket_path, engine):
+    """Arranca el daemon falso en un hilo y devuelve el servidor"""
+    server = FakeDockerServer(socket_path, engine)
+    threading.Thread(target=server.serve_forever, name="fake-docker", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daemon de Docker simulado")
+    parser.add_argument("--socket", default="/tmp/j5d-fake-docker.sock")
+    parser.add_argument("--containers", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos por llamada")
+    parser.add_argument("--stop-delay", type=float, default=0.0, help="segundos por stop")
+    args = parser.parse_args()
+    engine = FakeEngine(args.containers, args.latency, args.stop_delay)
+    server = FakeDockerServer(args.socket, engine)
+    print(f"🐳 Docker falso con {args.containers} contenedores en unix://{args.socket}")
+    server.serve_forever()
@@ -0,0 +1,301 @@
+"""Benchmarks de J5Dock contra el daemon de Docker falso (bench/fake_docker.py).
+
+    python3 bench/run.py                                  # todo, resultados en bench/results/latest.json
+    python3 bench/run.py --only api_data --sizes 100,10000
+    python3 bench/run.py --baseline bench/results/main.json --threshold 0.25
+
+Todo corre en un directorio temporal (base de datos, socket del daemon y
+socket de control), así que no toca los datos reales ni un servidor en marcha.
+Con --baseline compara cada medida (p50) y termina con código 1 si alguna
+empeora más del umbral.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_docker import FakeEngine, serve_in_thread  # noqa: E402
+
+SUITES = ("api_data", "project", "cli", "store")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+
+
+def summarize(samples):
+    """Tiempos en segundos -> estadísticas en ms"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(len(ordered) * 0.95)) - 1)]
+    return {
+        "runs": len(samples),
+        "p50": round(statistics.median(ordered) * 1000, 3),
+        "p95": round(p95 * 1000, 3),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+        "min": round(ordered[0] * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed(fn, runs, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class Bench:
+    """Daemon falso + J5Dock importado en un directorio temporal"""
+
+    def __init__(self, workdir, runs):
+        self.workdir = workdir
+        self.runs = runs
+        self.results = []
+        self.socket = os.path.join(workdir, "docker.sock")
+        self.engine = FakeEngine(containers=0)
+        self.server = serve_in_thread(self.socket, self.engine)
+        os.environ["DOCKER_HOST"] = f"unix://{self.socket}"
+        os.environ["J5D_SOCKET"] = os.path.join(workdir, "j5d.sock")
+        os.environ["J5D_METRICS"] = "0"
+        os.chdir(workdir)
+        import web
+        self.web = web
+        self.client = web.app.test_client()
+        web.registry.start(budget=5)
+
+    def record(self, name, params, samples, **extra):
+        result = {"name": name, "params": params, "unit": "ms", **summarize(samples), **extra}
+        self.results.append(result)
+        label = ", ".join(f"{k}={v}" for k, v in params.items())
+        sizes = "".join(f"  {k}={v}" for k, v in extra.items())
+        print(f"   {name:<28} {label:<44} p50 {result['p50']:>9.3f} ms  p95 {result['p95']:>9.3f} ms{sizes}")
+
+    def populate(self, total):
+        """Deja el daemon falso con total contenedores (c00000...) y resincroniza el índice"""
+        existing = sum(1 for c in self.engine.containers.values() if c["Names"][0].startswith("/c"))
+        with self.engine.lock:
+            for i in range(existing, total):
+                self.engine.create(f"c{i:05d}", running=i % 2 == 0,
+                                   volume=f"data{i % 10}" if i % 3 == 0 else None)
+        self.web.registry.refresh()
+
+    # --- /api/data ---
+    def api_data(self, sizes):
+        print("📊 /api/data")
+        for size in sizes:
+            self.populate(size)
+            params = {"containers": size}
+            body = []
+
+            def full():
+                body.append(len(self.client.get("/api/data").data))
+
+            self.record("api_data.full", params, timed(full, self.runs), bytes=body[-1])
+
+            body.clear()
+            self.record("api_data.no_containers", params,
+                        timed(lambda: body.append(len(self.client.get("/api/data?containers=0").data)), self.runs),
+                        bytes=body[-1])
+
+            version = self.client.get("/api/data").get_json()["version"]
+            self.record("api_data.not_modified", params,
+                        timed(lambda: self.client.get("/api/data", headers={"If-None-Match": f'"{version}"'}), self.runs))
+
+            # Delta con un único cambio desde el cursor
+            first = self.engine.find("c00000")
+            if first["State"] == "running":
+                self.engine.set_state(first, "exited", "die")
+            else:
+                self.engine.set_state(first, "running", "start")
+            self.web.registry.wait_until("c00000", lambda e: e and e["status"] == first["State"], 5)
+            body.clear()
+            self.record("api_data.delta", params,
+                        timed(lambda: body.append(len(self.client.get(f"/api/data?since={version}").data)), self.runs),
+                        bytes=body[-1])
+
+            self.record("api_containers.page", params,
+                        timed(lambda: self.client.get("/api/containers?limit=100&status=running"), self.runs))
+
+    # --- Start/stop de proyectos ---
+    def project(self, members_list, latency, stop_delay):
+        import cli
+        print(f"🚀 Proyectos (latencia {latency * 1000:g} ms por llamada, stop {stop_delay * 1000:g} ms)")
+        store = self.web.store
+        for members in members_list:
+            name = f"bench{members}"
+            refs = [f"{name}-{i:03d}" for i in range(members)]
+            with self.engine.lock:
+                for ref in refs:
+                    if self.engine.find(ref) is None:
+                        self.engine.create(ref)
+            self.web.registry.refresh()
+            for ref in refs:
+                store.add_to_project(name, ref)
+            params = {"members": members, "latency_ms": latency * 1000, "stop_delay_ms": stop_delay * 1000}
+            self.engine.latency, self.engine.stop_delay = latency, stop_delay
+            try:
+                api = {"start": [], "stop": []}
+                direct = {"start": [], "stop": []}
+                for _ in range(max(1, self.runs // 4)):
+                    for action in ("start", "stop"):
+                        start = time.perf_counter()
+                        response = self.client.post(f"/api/project/{action}/{name}")
+                        api[action].append(time.perf_counter() - start)
+                        if not response.get_json().get("success"):
+                            print(f"⚠️  {action} {name} falló: {response.get_json()}")
+                    for action, fn in (("start", cli.cli_start_project), ("stop", cli.cli_stop_project)):
+                        start = time.perf_counter()
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            fn(name)
+                        direct[action].append(time.perf_counter() - start)
+            finally:
+                self.engine.latency, self.engine.stop_delay = 0.0, 0.0
+            for action in ("start", "stop"):
+                self.record(f"project.api_{action}", params, api[action])
+                self.record(f"project.cli_{action}", params, direct[action])
+
+    # --- Arranque de la terminal ---
+    def cli(self):
+        from control import ControlServer
+        print("💻 Arranque de j5d (proceso nuevo)")
+        name = "benchcli"
+        if self.engine.find("benchcli-000") is None:
+            with self.engine.lock:
+                self.engine.create("benchcli-000", running=True)
+            self.web.registry.refresh()
+        self.web.store.add_to_project(name, "benchcli-000")
+        command = [sys.executable, os.path.join(ROOT, "main.py"), "start", name]
+
+        def run():
+            subprocess.run(command, cwd=self.workdir, stdout=subprocess.DEVNULL, check=True)
+
+        runs = max(3, self.runs // 2)
+        self.record("cli.start_direct", {}, timed(run, runs))
+        # Con el servidor en marcha el comando se delega por el socket de control
+        control = ControlServer(self.web.CONTROL_COMMANDS)
+        control.start()
+        try:
+            self.record("cli.start_delegated", {}, timed(run, runs))
+        finally:
+            control.close()
+        self.record("cli.python_startup", {}, timed(
+            lambda: subprocess.run([sys.executable, "-c", "pass"], check=True), runs))
+
+    # --- Store ---
+    def store(self, sizes):
+        import services
+        print("🗄️  load_data / save_data")
+        original = services.load_data()
+        try:
+            for size in sizes:
+                data = {
+                    "aliases": {f"alias{i}": f"c{i:05d}" for i in range(size)},
+                    "projects": {f"proj{i}": [f"c{i * 5 + k:05d}" for k in range(5)] for i in range(max(1, size // 5))},
+                }
+                params = {"entries": size}
+                self.record("store.save_data", params, timed(lambda: services.save_data(data), self.runs))
+                self.record("store.load_data", params, timed(services.load_data, self.runs))
+        finally:
+            services.save_data(original)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def key(result):
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline_path, threshold):
+    """Imprime la comparación con una ejecución anterior; devuelve las regresiones"""
+    with open(baseline_path) as f:
+        baseline = {key(r): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\n📈 Comparación con {baseline_path} (umbral {threshold:.0%})")
+    for result in results:
+        old = baseline.get(key(result))
+        if old is None or not old["p50"]:
+            continue
+        change = result["p50"] / old["p50"] - 1
+        flag = "❌" if change > threshold else "✅"
+        label = ", ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(f"   {flag} {result['name']:<28} {label:<44} {old['p50']:>9.3f} -> {result['p50']:>9.3f} ms ({change:+.0%})")
+        if change > threshold:
+            regressions.append({"name": result["name"], "params": result["params"],
+                                "baseline": old["p50"], "p50": result["p50"], "change": round(change, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de J5Dock con un daemon de Docker simulado")
+    parser.add_argument("--only", action="append", choices=SUITES, help="suites a ejecutar (por defecto todas)")
+    parser.add_argument("--sizes", default="100,1000,5000", help="contenedores para /api/data")
+    parser.add_argument("--members", default="10,50", help="contenedores por proyecto")
+    parser.add_argument("--store-sizes", default="100,1000,10000", help="alias para load_data/save_data")
+    parser.add_argument("--latency", type=float, default=0.005, help="segundos por llamada al daemon (proyectos)")
+    parser.add_argument("--stop-delay", type=float, default=0.1, help="segundos por stop (proyectos)")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="resultados anteriores con los que comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="empeoramiento del p50 que cuenta como regresión")
+    args = parser.parse_args()
+    suites = args.only or SUITES
+    ints = lambda value: [int(v) for v in value.split(",") if v]  # noqa: E731
+
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    started = time.time()
+    with tempfile.TemporaryDirectory(prefix="j5d-bench-") as workdir:
+        bench = Bench(workdir, args.runs)
+        if "api_data" in suites:
+            bench.api_data(ints(args.sizes))
+        if "project" in suites:
+            bench.project(ints(args.members), args.latency, args.stop_delay)
+        if "cli" in suites:
+            bench.cli()
+        if "store" in suites:
+            bench.store(ints(args.store_sizes))
+        bench.server.shutdown()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": started,
+            "duration_s": round(time.time() - started, 1),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        },
+        "results": bench.results,
+    }
+    if baseline:
+        report["regressions"] = compare(bench.results, baseline, args.threshold)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Resultados en {output}")
+    if report.get("regressions"):
+        print(f"❌ {len(report['regressions'])} regresiones por encima del {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
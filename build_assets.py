@@ -0,0 +1,111 @@
+"""Compila los assets de la interfaz web en static/dist.
+
+    npm install              # tailwindcss y vue (solo hace falta para compilar)
+    python3 build_assets.py
+
+Genera el CSS de Tailwind purgado con solo las clases usadas, copia la build
+de producción de Vue y el script de la SPA con un hash en el nombre, y deja
+versiones .gz (y .br si está instalado el módulo brotli) junto a cada fichero.
+static/dist no necesita red: se puede copiar tal cual a hosts sin acceso a
+Internet.
+"""
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from assets import DIST_DIR, MANIFEST, SRC_DIR
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VUE_PROD = os.path.join(BASE_DIR, "node_modules", "vue", "dist", "vue.global.prod.js")
+TAILWIND_BIN = os.path.join(BASE_DIR, "node_modules", ".bin", "tailwindcss")
+
+
+def build_css():
+    if not os.path.exists(TAILWIND_BIN):
+        sys.exit("❌ No se encontró tailwindcss. Ejecuta 'npm install' primero.")
+    result = subprocess.run(
+        [TAILWIND_BIN, "-c", os.path.join(BASE_DIR, "tailwind.config.js"),
+         "-i", os.path.join(SRC_DIR, "app.css"), "--minify"],
+        cwd=BASE_DIR, check=True, capture_output=True,
+    )
+    return result.stdout
+
+
+def read_vue():
+    if not os.path.exists(VUE_PROD):
+        sys.exit("❌ No se encontró vue.global.prod.js. Ejecuta 'npm install' primero.")
+    with open(VUE_PROD, "rb") as f:
+        return f.read()
+
+
+def write_hashed(name, content):
+    base, ext = os.path.splitext(name)
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    filename = f"{base}.{digest}{ext}"
+    with open(os.path.join(DIST_DIR, filename), "wb") as f:
+        f.write(content)
+    return filename
+
+
+def precompress(path):
+    with open(path, "rb") as f:
+        content = f.read()
+    with open(path + ".gz", "wb") as f:
+        # mtime=0 para que la misma entrada produzca siempre el mismo .gz
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return False
+    with open(path + ".br", "wb") as f:
+        f.write(brotli.compress(content, quality=11))
+    return True
+
+
+def main():
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    with open(os.path.join(SRC_DIR, "app.js"), "rb") as f:
+        app_js = f.read()
+    manifest = {
+        "app.css": write_hashed("app.css", build_css()),
+        "vue.js": write_hashed("vue.js", read_vue()),
+        "app.js": write_hashed("app.js", app_js),
+    }
+
+    with open(os.path.join(SRC_DIR, "index.html"), "r") as f:
+        page = f.read()
+    head = f'    <link rel="stylesheet" href="/assets/{manifest["app.css"]}">\n'
+    body = (
+        f'<script src="/assets/{manifest["vue.js"]}"></script>\n'
+        f'<script src="/assets/{manifest["app.js"]}"></script>\n'
+    )
+    page = page.replace("    <!-- assets:head -->\n", head).replace("<!-- assets:body -->\n", body)
+    with open(os.path.join(DIST_DIR, "index.html"), "w") as f:
+        f.write(page)
+
+    brotli_ok = True
+    for path in glob.glob(os.path.join(DIST_DIR, "*")):
+        brotli_ok = precompress(path) and brotli_ok
+    # El manifest se escribe al final: su presencia activa los assets compilados
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    for name, filename in manifest.items():
+        size = os.path.getsize(os.path.join(DIST_DIR, filename))
+        gz = os.path.getsize(os.path.join(DIST_DIR, filename + ".gz"))
+        print(f"  ✅ {name:8} -> {filename} ({size / 1024:.1f} KB, gzip {gz / 1024:.1f} KB)")
+    if not brotli_ok:
+        print("⚠️  Módulo brotli no instalado: solo se generaron versiones .gz (pip install brotli)")
+    print(f"📦 Assets compilados en {DIST_DIR}")
+
+
+if __name__ == "__main__":
+    main()
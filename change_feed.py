@@ -0,0 +1,68 @@
+import json
+import queue
+import threading
+
+# Eventos pendientes por cliente antes de considerarlo lento y cortarle el stream
+MAX_PENDING = 256
+# Cada cuánto se manda un comentario para mantener viva la conexión SSE
+HEARTBEAT = 15
+
+
+class Subscription:
+    """Cola acotada de un cliente conectado a /api/stream"""
+
+    def __init__(self, maxsize=MAX_PENDING):
+        self._queue = queue.Queue(maxsize)
+        self.closed = False
+
+    def put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Cliente lento: se cierra su stream y al reconectar hará un fetch completo
+            self.closed = True
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ChangeFeed:
+    """Difunde los cambios de contenedores, alias y proyectos a los clientes SSE"""
+
+    def __init__(self, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self):
+        sub = Subscription(self.max_pending)
+        with self._lock:
+            self._subscriptions.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscriptions.discard(sub)
+
+    def publish(self, event, payload):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for sub in subscriptions:
+            sub.put((event, payload))
+
+    def stream(self, sub, heartbeat=HEARTBEAT):
+        """Generador con el formato text/event-stream para una suscripción"""
+        try:
+            yield "retry: 3000\n\n"
+            while not sub.closed:
+                item = sub.get(heartbeat)
+                if item is None:
+                    yield ": ping\n\n"
+                    continue
+                event, payload = item
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            self.unsubscribe(sub)
@@ -0,0 +1,250 @@
+# Funciones para la Terminal (CLI)
+#
+# Solo importa lo imprescindible: si el servidor web está corriendo, el comando
+# se le envía por el socket de control y se aprovechan su caché de contenedores
+# y su conexión con Docker. Si no, se ejecuta aquí mismo (modo directo).
+import time
+
+from project_ops import CONCURRENCY, START_TIMEOUT, STOP_TIMEOUT, run_ordered_action, run_project_action
+
+MESSAGES = {
+    "start": ("🚀 Iniciando proyecto", "iniciado", "ya estaba en ejecución", "iniciar"),
+    "stop": ("🛑 Deteniendo proyecto", "detenido", "ya estaba detenido", "detener"),
+    "suspend": ("⏸️  Suspendiendo proyecto", "pausado", "no estaba en marcha", "pausar"),
+    "resume": ("▶️  Reanudando proyecto", "reanudado", "no estaba pausado", "reanudar"),
+}
+COMMANDS = tuple(MESSAGES)
+
+
+def project_command(message, emit, registry, store):
+    """Ejecuta start/stop/suspend/resume de un proyecto; lo usan el modo
+    directo, el socket de control y la API web.
+
+    Envía {"type": "started"} y un {"type": "result"} por contenedor mediante
+    emit, y devuelve el mensaje final. message puede traer "concurrency" y
+    "timeout" para sustituir los valores por defecto.
+    """
+    action, project_name = message["command"], message["project"]
+    members = store.get_project(project_name)
+    if members is None:
+        return {"type": "error", "message": f"El proyecto '{project_name}' no existe."}
+    emit({"type": "started", "project": project_name})
+
+    # El servidor tiene los índices al día por eventos; en modo directo basta
+    # un único listado por motor en lugar de un inspect por contenedor
+    engines = set()
+    for container_name in members:
+        try:
+            engines.add(registry.resolve(container_name)[0])
+        except KeyError:
+            pass
+    pending = [engine for engine in engines if not engine.ready.is_set()]
+    if pending:
+        registry.refresh(pending)
+    concurrency = message.get("concurrency") or CONCURRENCY
+    on_result = lambda r: emit({"type": "result", **r})
+
+    state = store.project_state(project_name)
+    if action == "suspend":
+        return _suspend(registry, store, project_name, members, state, concurrency, on_result)
+    if action == "resume":
+        return _resume(registry, store, project_name, members, state, concurrency, on_result)
+    resumed = {}
+    if action == "start" and state["suspended"]:
+        # Un start sobre un proyecto suspendido primero lo reanuda y luego
+        # arranca lo que faltara; lo reanudado no se vuelve a esperar y cuenta
+        # con el resultado de la reanudación
+        reply = _resume(registry, store, project_name, members, state, concurrency, None)
+        resumed = {r["container"]: r for r in reply["results"] if r["ok"] and not r.get("skipped")}
+        on_result = lambda r, report=on_result: report(_resumed_result(resumed, r))
+    if action == "stop" and state["suspended"]:
+        store.clear_suspended(project_name)
+
+    skip = set(resumed)
+    for container_name in members:
+        try:
+            entry = registry.get(container_name)
+        except KeyError:
+            entry = None
+        if not entry:
+            continue
+        running = entry["status"] in ("running", "paused", "restarting")
+        if (action == "start" and entry["status"] == "running") or (action == "stop" and not running):
+            skip.add(container_name)
+
+    # Con dependencias se arranca por oleadas y se detiene en orden inverso
+    config = store.project_config(project_name)
+    try:
+        results = run_ordered_action(
+            registry, members, action,
+            depends_on=config["depends_on"],
+            concurrency=concurrency,
+            stop_timeout=message.get("timeout") or config["stop_timeout"] or STOP_TIMEOUT,
+            start_timeout=config["start_timeout"] or START_TIMEOUT,
+            skip=skip,
+            on_result=on_result,
+            on_wave=lambda wave_action, wave: emit({"type": "wave", "action": wave_action, "containers": wave}),
+            resumed=set(resumed),
+        )
+    except ValueError as e:
+        return {"type": "error", "message": str(e)}
+    return {"type": "done", "results": [_resumed_result(resumed, r) for r in results]}
+
+
+def _resumed_result(resumed, result):
+    """El resultado de la reanudación sustituye al "ya estaba en marcha",
+    nunca a un fallo posterior"""
+    if result.get("skipped") and result["container"] in resumed:
+        return resumed[result["container"]]
+    return result
+
+
+def _status(registry, ref):
+    try:
+        return (registry.get(ref) or {}).get("status")
+    except KeyError:
+        return None
+
+
+def _suspend(registry, store, project_name, members, state, concurrency, on_result):
+    """Pausa los contenedores en marcha y recuerda cuáles eran"""
+    running = [ref for ref in members if _status(registry, ref) == "running"]
+    results = run_project_action(
+        registry, members, "pause", concurrency,
+        skip={ref for ref in members if ref not in running}, on_result=on_result,
+    )
+    paused = [r["container"] for r in results if r["ok"] and not r.get("skipped")]
+    # Suspender dos veces no olvida lo que ya estaba pausado de la primera
+    previous = [ref for ref in state["containers"] if ref not in paused and _status(registry, ref) == "paused"]
+    state = store.set_suspended(project_name, previous + paused)
+    return {"type": "done", "results": results, "state": state}
+
+
+def _resume(registry, store, project_name, members, state, concurrency, on_result):
+    """Despierta solo lo que se pausó al suspender (o, sin registro, lo que esté pausado)"""
+    targets = state["containers"] if state["suspended"] else members
+    wake = [ref for ref in targets if _status(registry, ref) == "paused"]
+    start = time.perf_counter()
+    results = run_project_action(
+        registry, members, "unpause", concurrency,
+        skip={ref for ref in members if ref not in wake}, on_result=on_result,
+    )
+    resume_ms = round((time.perf_counter() - start) * 1000, 1)
+    state = store.clear_suspended(project_name, resume_ms if wake else None)
+    return {"type": "done", "results": results, "state": state, "resume_ms": resume_ms}
+
+
+def _printer(action):
+    header, done, already, failed = MESSAGES[action]
+
+    def show(message):
+        if message["type"] == "started":
+            print(f"{header}: {message['project']}")
+        elif message["type"] == "wave":
+            print(f"  ⏳ {'Arrancando' if message['action'] == 'start' else 'Deteniendo'}: {', '.join(message['containers'])}")
+        elif message["type"] == "result":
+            if message.get("skipped"):
+                print(f"  ✅ Contenedor {message['container']} {already}.")
+            elif message["ok"]:
+                print(f"  ✅ Contenedor {message['container']} {done}. ({message['elapsed_ms']:.0f} ms)")
+            else:
+                print(f"  ❌ Error al {failed} {message['container']}: {message['error']}")
+    return show
+
+
+def _finish(reply):
+    if reply["type"] == "error":
+        print(f"❌ Error: {reply['message']}")
+        return None
+    if reply.get("resume_ms") is not None:
+        print(f"⚡ Reanudado en {reply['resume_ms']:.0f} ms")
+    return reply["results"]
+
+
+def _run_direct(action, project_name):
+    import services
+    message = {"command": action, "project": project_name}
+    reply = project_command(message, _printer(action), services.get_registry(), services.get_store())
+    return _finish(reply)
+
+
+def run_command(action, project_name):
+    """Delegar en el servidor si está corriendo; si no, modo directo"""
+    from control import ServerUnavailable, send_command
+    try:
+        reply = send_command({"command": action, "project": project_name}, _printer(action))
+    except ServerUnavailable:
+        return _run_direct(action, project_name)
+    return _finish(reply)
+
+
+def cli_start_project(project_name):
+    return run_command("start", project_name)
+
+
+def cli_stop_project(project_name):
+    return run_command("stop", project_name)
+
+
+def cli_suspend_project(project_name):
+    return run_command("suspend", project_name)
+
+
+def cli_resume_project(project_name):
+    return run_command("resume", project_name)
+
+
+# Secciones de "j5d-stats": métrica -> (título, etiqueta de cada fila)
+STATS_SECTIONS = (
+    ("j5d_http_request_seconds", "🌐 Peticiones HTTP", lambda r: f"{r['method']} {r['route']}"),
+    ("j5d_docker_request_seconds", "🐳 API de Docker", lambda r: f"{r['operation']} [{r['engine']}]"),
+    ("j5d_store_seconds", "🗄️  load_data / save_data", lambda r: r["op"]),
+    ("j5d_store_transaction_seconds", "🗄️  Transacciones SQLite", lambda r: r["mode"]),
+    ("j5d_index_refresh_seconds", "📋 Listados del índice", lambda r: "refresh"),
+)
+
+
+def _format_uptime(seconds):
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+
+
+def print_stats(stats, profiling=None, top=10):
+    print(f"📊 J5Dock: servidor en marcha desde hace {_format_uptime(stats['uptime'])}")
+    for metric, title, label in STATS_SECTIONS:
+        rows = stats["timings"].get(metric)
+        if not rows:
+            continue
+        print(f"\n{title}")
+        print(f"   {'':<44} {'n':>7} {'media':>9} {'p50':>9} {'p95':>9} {'total':>10}")
+        for row in rows[:top]:
+            print(f"   {label(row)[:44]:<44} {row['count']:>7} {row['mean_ms']:>7.2f}ms {row['p50_ms']:>7.2f}ms "
+                  f"{row['p95_ms']:>7.2f}ms {row['total_ms'] / 1000:>9.2f}s")
+    errors = stats["counters"].get("j5d_docker_errors_total")
+    if errors:
+        print(f"\n⚠️  Llamadas a Docker fallidas: {sum(e['value'] for e in errors)}")
+    if stats["caches"]:
+        print("\n🎯 Cachés")
+        for name, cache in sorted(stats["caches"].items()):
+            total = sum(v for k, v in cache.items() if k != "hit_ratio")
+            print(f"   {name:<20} {cache['hit_ratio']:>6.1%} aciertos ({cache.get('hit', 0)}/{total})")
+    if profiling:
+        state = "activado" if profiling["enabled"] else "desactivado"
+        prefix = f" (solo {profiling['prefix']})" if profiling.get("prefix") else ""
+        print(f"\n🔬 Perfilado de peticiones: {state}{prefix}, {profiling['profiles']} perfiles guardados")
+
+
+def cli_stats():
+    """Resumen de la instrumentación del servidor web (j5d-stats)"""
+    from control import ServerUnavailable, send_command
+    try:
+        reply = send_command({"command": "stats"}, lambda message: None)
+    except ServerUnavailable:
+        print("❌ El servidor no está en marcha: las estadísticas se recogen en su proceso (python3 main.py).")
+        return False
+    if reply["type"] == "error":
+        print(f"❌ Error: {reply['message']}")
+        return False
+    print_stats(reply["stats"], reply.get("profiling"))
+    return True
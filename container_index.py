@@ -0,0 +1,277 @@
+import os
+import threading
+import time
+
+from telemetry import telemetry
+
+# Cada cuántos segundos se vuelve a listar todo para corregir desajustes
+RESYNC_INTERVAL = int(os.environ.get("J5D_RESYNC_INTERVAL", "300"))
+
+# Traducción de eventos de Docker al estado que mostramos en la interfaz
+EVENT_STATUS = {
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+}
+
+# Resultado del healthcheck según el texto de estado ("Up 5 seconds (healthy)")
+HEALTH_MARKERS = (("(health: starting)", "starting"), ("(unhealthy)", "unhealthy"), ("(healthy)", "healthy"))
+
+# Eventos que cambian algo más que el estado (nombre, montajes...)
+EVENT_REFRESH = {"create", "rename", "update"}
+
+# Contenedores borrados que se recuerdan para poder responder a ?since=
+MAX_TOMBSTONES = 10000
+
+
+def _bind_path(mounts):
+    for m in mounts or []:
+        if m.get("Type") == "bind":
+            return m.get("Source")
+    return "No bind mount"
+
+
+def _health(status_text):
+    """Estado del healthcheck, o None si no tiene (o no está en marcha)"""
+    for marker, health in HEALTH_MARKERS:
+        if marker in (status_text or ""):
+            return health
+    return None
+
+
+def _entry_from_summary(summary):
+    """Convierte un elemento de /containers/json en una entrada del índice"""
+    names = summary.get("Names") or [summary.get("Id", "")[:12]]
+    return summary["Id"], {
+        "name": names[0].lstrip("/"),
+        "status": summary.get("State", "unknown"),
+        "path": _bind_path(summary.get("Mounts")),
+        "health": _health(summary.get("Status")),
+    }
+
+
+def _keep_health(entry, old):
+    """El listado de un contenedor pausado no trae la salud ("Up (Paused)"),
+    pero Docker la conserva: se mantiene la que ya sabíamos"""
+    if entry["status"] == "paused" and entry["health"] is None and old:
+        entry["health"] = old.get("health")
+
+
+class ContainerIndex:
+    """Índice en memoria de los contenedores, alimentado por client.events().
+
+    Hace un único listado completo al arrancar y a partir de ahí solo aplica
+    los eventos del daemon. Cada RESYNC_INTERVAL segundos se vuelve a listar
+    todo por si se perdió algún evento.
+    """
+
+    def __init__(self, client, resync_interval=RESYNC_INTERVAL):
+        self.client = client
+        self.resync_interval = resync_interval
+        self._lock = threading.Lock()
+        self._entries = {}  # nombre -> {"name", "status", "path", "health"}
+        self._ids = {}      # id -> nombre
+        self._events = iter(())
+        self._started = False
+        self._stopped = threading.Event()
+        self._listeners = []
+        # Versión del índice: sube con cada cambio. Se siembra con la hora en ms
+        # para que siga creciendo aunque se reinicie el servidor.
+        self.version = int(time.time() * 1000)
+        self._floor = self.version  # por debajo de esto no se pueden dar deltas
+        self._versions = {}         # nombre -> versión de su último cambio (incluye borrados)
+
+    def add_listener(self, callback):
+        """callback(entry) se llama con cada cambio; si el contenedor desapareció
+        la entrada es {"name": ..., "deleted": True}"""
+        self._listeners.append(callback)
+
+    def _record(self, changes):
+        """Asigna versión a los cambios; se llama con el lock tomado"""
+        for entry in changes:
+            self.version += 1
+            self._versions.pop(entry["name"], None)
+            self._versions[entry["name"]] = self.version
+        tombstones = len(self._versions) - len(self._entries)
+        if tombstones > MAX_TOMBSTONES:
+            # _versions está ordenado por versión: se olvidan los borrados más antiguos
+            for name in list(self._versions):
+                if tombstones <= MAX_TOMBSTONES:
+                    break
+                if name not in self._entries:
+                    self._floor = self._versions.pop(name)
+                    tombstones -= 1
+
+    def _notify(self, changes):
+        for entry in changes:
+            for callback in self._listeners:
+                try:
+                    callback(entry)
+                except Exception as e:
+                    print(f"⚠️  Error notificando cambio de {entry.get('name')}: {e}")
+
+    # --- Sincronización con el daemon ---
+    def refresh(self):
+        """Listado completo (una sola llamada, sin inspeccionar cada contenedor)"""
+        with telemetry.timer("j5d_index_refresh_seconds"):
+            summaries = self.client.api.containers(all=True)
+            entries, ids = {}, {}
+            for s in summaries:
+                cid, entry = _entry_from_summary(s)
+                entries[entry["name"]] = entry
+                ids[cid] = entry["name"]
+        with self._lock:
+            old = self._entries
+            for name, entry in entries.items():
+                _keep_health(entry, old.get(name))
+            self._entries = entries
+            self._ids = ids
+            changes = [dict(e) for name, e in entries.items() if old.get(name) != e]
+            changes += [{"name": name, "deleted": True} for name in old if name not in entries]
+            self._record(changes)
+        self._notify(changes)
+
+    def _refresh_one(self, cid):
+        summaries = self.client.api.containers(all=True, filters={"id": cid})
+        changes = []
+        with self._lock:
+            old_name = self._ids.pop(cid, None)
+            old = self._entries.pop(old_name, None) if old_name is not None else None
+            for s in summaries:
+                cid, entry = _entry_from_summary(s)
+                _keep_health(entry, old)
+                self._entries[entry["name"]] = entry
+                self._ids[cid] = entry["name"]
+                changes.append(dict(entry))
+            if old_name is not None and old_name not in {e["name"] for e in changes}:
+                changes.append({"name": old_name, "deleted": True})
+            self._record(changes)
+        self._notify(changes)
+
+    def _remove(self, cid):
+        with self._lock:
+            name = self._ids.pop(cid, None)
+            if name is not None:
+                self._entries.pop(name, None)
+                self._record([{"name": name, "deleted": True}])
+        if name is not None:
+            self._notify([{"name": name, "deleted": True}])
+
+    def apply_event(self, event):
+        """Aplica un evento de tipo container al índice"""
+        action, _, detail = (event.get("Action") or event.get("status") or "").partition(":")
+        actor = event.get("Actor") or {}
+        cid = actor.get("ID") or event.get("id")
+        if not cid:
+            return
+        telemetry.inc("j5d_index_events_total", action=action)
+        if action == "destroy":
+            self._remove(cid)
+        elif action in EVENT_REFRESH or cid not in self._ids:
+            self._refresh_one(cid)
+        elif action in EVENT_STATUS:
+            # Un contenedor parado no tiene healthcheck en curso; uno pausado conserva
+            # su estado de salud (Docker no manda health_status al reanudarlo)
+            self._update(cid, status=EVENT_STATUS[action], **({"health": None} if action in ("die", "stop") else {}))
+        elif action == "health_status":
+            self._update(cid, health=detail.strip())
+
+    def _update(self, cid, **fields):
+        changed = None
+        with self._lock:
+            entry = self._entries.get(self._ids.get(cid))
+            if entry and any(entry.get(k) != v for k, v in fields.items()):
+                entry.update(fields)
+                changed = dict(entry)
+                self._record([changed])
+        if changed:
+            self._notify([changed])
+
+    def _subscribe(self):
+        self._events = self.client.events(decode=True, filters={"type": "container"})
+
+    def _follow_events(self):
+        while not self._stopped.is_set():
+            try:
+                for event in self._events:
+                    self.apply_event(event)
+            except Exception as e:
+                if not self._stopped.is_set():
+                    print(f"⚠️  Stream de eventos de Docker interrumpido: {e}")
+            if self._stopped.wait(2):
+                break
+            try:
+                self._subscribe()
+                # Lo que pasó mientras no escuchábamos se recupera con un listado completo
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  No se pudo reconectar al stream de eventos: {e}")
+
+    def _periodic_resync(self):
+        while not self._stopped.wait(self.resync_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  Error al resincronizar contenedores: {e}")
+
+    # --- Ciclo de vida ---
+    @property
+    def started(self):
+        return self._started
+
+    def start(self):
+        """Listado inicial y arranque de los hilos de eventos y resincronización"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        try:
+            # Suscribirse antes de listar para no perder eventos entre medias
+            self._subscribe()
+            self.refresh()
+        except Exception:
+            # El motor reintenta start(): no dejar abierto el stream de eventos de este intento
+            self._close_events()
+            self._started = False
+            raise
+        threading.Thread(target=self._follow_events, name="j5d-events", daemon=True).start()
+        threading.Thread(target=self._periodic_resync, name="j5d-resync", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+        self._close_events()
+
+    def _close_events(self):
+        events, self._events = self._events, iter(())
+        close = getattr(events, "close", None)
+        if close:
+            close()
+
+    # --- Lectura ---
+    def list(self):
+        with self._lock:
+            return [dict(e) for e in self._entries.values()]
+
+    def changes_since(self, version):
+        """(cambiados, borrados) desde la versión dada, o None si es demasiado
+        antigua (o de otra ejecución del servidor) y hace falta el listado completo"""
+        with self._lock:
+            if version < self._floor or version > self.version:
+                return None
+            changed, deleted = [], []
+            for name, v in reversed(self._versions.items()):
+                if v <= version:
+                    break
+                if name in self._entries:
+                    changed.append(dict(self._entries[name]))
+                else:
+                    deleted.append(name)
+            return changed, deleted
+
+    def get(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            return dict(entry) if entry else None
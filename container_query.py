@@ -0,0 +1,147 @@
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right
+
+from telemetry import telemetry
+
+SORT_KEYS = ("name", "status", "engine", "path")
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = tuple(json.loads(base64.urlsafe_b64decode(padded)))
+    except (ValueError, TypeError):
+        raise InvalidQuery("Cursor inválido")
+    if len(key) != 2 or not all(isinstance(k, str) for k in key):
+        raise InvalidQuery("Cursor inválido")
+    return key
+
+
+def sort_key(container, key):
+    """Clave de orden (valor, nombre); el nombre desempata y hace únicas las claves"""
+    return ("" if key == "name" else str(container.get(key, "")), container["name"])
+
+
+class InventoryView:
+    """Foto ordenada del inventario de contenedores para una versión concreta.
+
+    Las ordenaciones y los grupos por estado se calculan la primera vez que se
+    piden y se reutilizan hasta que cambia la versión.
+    """
+
+    def __init__(self, containers):
+        self.containers = containers
+        self._orders = {}
+        self._by_status = None
+        self._lock = threading.Lock()
+
+    def order(self, key):
+        """(contenedores, claves) ordenados por (key, name)"""
+        with self._lock:
+            telemetry.cache("inventory_order", "hit" if key in self._orders else "miss")
+            if key not in self._orders:
+                items = sorted(self.containers, key=lambda c: sort_key(c, key))
+                self._orders[key] = (items, [sort_key(c, key) for c in items])
+            return self._orders[key]
+
+    def by_status(self):
+        """estado -> (contenedores, nombres) ordenados por nombre"""
+        with self._lock:
+            if self._by_status is None:
+                groups = {}
+                for c in sorted(self.containers, key=lambda c: c["name"]):
+                    groups.setdefault(c["status"], []).append(c)
+                self._by_status = {s: (items, [sort_key(c, "name") for c in items]) for s, items in groups.items()}
+            return self._by_status
+
+
+class ContainerQuery:
+    """Filtrado, ordenación y paginación por cursor sobre el inventario en memoria"""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._version = None
+        self._view = None
+
+    def view(self):
+        version = self.registry.version()
+        with self._lock:
+            telemetry.cache("inventory_view", "hit" if version == self._version else "miss")
+            if version != self._version:
+                self._view = InventoryView(self.registry.list())
+                self._version = version
+            return self._view
+
+    def run(self, status=None, q=None, prefix=None, engine=None, members=None,
+            sort="name", limit=DEFAULT_LIMIT, cursor=None, with_total=False):
+        descending = sort.startswith("-")
+        key = sort.lstrip("-")
+        if key not in SORT_KEYS:
+            raise InvalidQuery(f"Orden desconocido: {sort} (usa {', '.join(SORT_KEYS)})")
+        limit = max(1, min(limit, MAX_LIMIT))
+        view = self.view()
+
+        # Candidatos: un único grupo de estado ordenado por nombre evita recorrer todo
+        statuses = set(status) if status else None
+        single_status = key == "name" and statuses is not None and len(statuses) == 1
+        if single_status:
+            items, keys = view.by_status().get(next(iter(statuses)), ([], []))
+        else:
+            items, keys = view.order(key)
+
+        # Rango por prefijo de nombre con búsqueda binaria
+        lo, hi = 0, len(items)
+        if prefix and key == "name":
+            lo = bisect_left(keys, ("", prefix))
+            hi = bisect_left(keys, ("", prefix + "\U0010ffff"))
+
+        q = q.lower() if q else None
+
+        def matches(c):
+            return (
+                (statuses is None or c["status"] in statuses)
+                and (not prefix or c["name"].startswith(prefix))
+                and (q is None or q in c["name"].lower())
+                and (engine is None or c.get("engine") == engine)
+                and (members is None or c["name"] in members)
+            )
+
+        total = None
+        if with_total:
+            if single_status and not (q or engine or members is not None):
+                total = hi - lo
+            else:
+                total = sum(1 for i in range(lo, hi) if matches(items[i]))
+
+        # Posición de inicio según el cursor (último elemento de la página anterior)
+        if cursor:
+            last = decode_cursor(cursor)
+            if descending:
+                hi = min(hi, bisect_left(keys, last, lo, hi))
+            else:
+                lo = max(lo, bisect_right(keys, last, lo, hi))
+
+        span = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        page, next_cursor = [], None
+        for i in span:
+            c = items[i]
+            if not matches(c):
+                continue
+            if len(page) == limit:
+                next_cursor = encode_cursor(sort_key(page[-1], key))
+                break
+            page.append(c)
+        return {"containers": page, "next": next_cursor, "total": total}
@@ -0,0 +1,97 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+
+# Socket local por el que la terminal le pasa comandos al servidor web ya arrancado
+CONTROL_SOCKET = os.environ.get("J5D_SOCKET", os.path.join(os.path.expanduser("~"), ".j5d.sock"))
+# Si el servidor no contesta en este tiempo se usa el modo directo
+CONNECT_TIMEOUT = 0.5
+
+
+class ServerUnavailable(Exception):
+    """No hay servidor escuchando en el socket de control"""
+
+
+def send_command(message, on_message, path=CONTROL_SOCKET):
+    """Envía un comando al servidor y llama a on_message con cada mensaje
+    intermedio. Devuelve el mensaje final ("done" o "error")."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise ServerUnavailable("Sockets unix no disponibles")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError as e:
+        sock.close()
+        raise ServerUnavailable(e)
+    # A partir de aquí el comando ya se está ejecutando: no se reintenta en directo
+    sock.settimeout(None)
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(message).encode() + b"\n")
+        stream.flush()
+        for line in stream:
+            reply = json.loads(line)
+            if reply.get("type") in ("done", "error"):
+                return reply
+            on_message(reply)
+    raise ConnectionError("El servidor cerró la conexión sin terminar el comando")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def emit(self, message):
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            message = json.loads(line)
+            command = self.server.commands.get(message.get("command"))
+            if command is None:
+                reply = {"type": "error", "message": f"Comando desconocido: {message.get('command')}"}
+            else:
+                reply = command(message, self.emit)
+        except Exception as e:
+            reply = {"type": "error", "message": str(e)}
+        try:
+            self.emit(reply)
+        except OSError:
+            pass
+
+
+class ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor del socket de control dentro del proceso web.
+
+    commands es un dict nombre -> callable(message, emit) que devuelve el
+    mensaje final; emit(mensaje) envía mensajes intermedios al cliente.
+    """
+    daemon_threads = True
+
+    def __init__(self, commands, path=CONTROL_SOCKET):
+        self.commands = commands
+        self.path = path
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                os.unlink(path)  # socket de un servidor que ya no existe
+            else:
+                raise RuntimeError(f"Ya hay un servidor J5Dock escuchando en {path}")
+            finally:
+                probe.close()
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="j5d-control", daemon=True).start()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
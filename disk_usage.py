@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+
+from telemetry import telemetry
+
+# Segundos que vale la foto de uso de disco antes de pedir otra (en segundo plano)
+DISK_TTL = int(os.environ.get("J5D_DISK_TTL", "300"))
+# Contenedores que devuelve /api/disk si no se pide ?limit=
+DEFAULT_TOP = 50
+
+
+def _size(value):
+    """Tamaño del daemon; -1 o ausente es "no calculado" -> None"""
+    return value if isinstance(value, int) and value >= 0 else None
+
+
+def parse_mounts(mounts, volume_sizes=None):
+    """Todos los montajes (binds, volúmenes, tmpfs) de un contenedor, no solo el primero"""
+    volume_sizes = volume_sizes or {}
+    out = []
+    for m in mounts or []:
+        mount = {
+            "type": m.get("Type"),
+            "source": m.get("Source"),
+            "destination": m.get("Destination"),
+            "name": m.get("Name"),
+            "rw": m.get("RW", True),
+            "size": None,
+        }
+        if mount["type"] == "volume":
+            mount["size"] = volume_sizes.get(mount["name"])
+        out.append(mount)
+    return out
+
+
+def parse_df(df):
+    """Respuesta de /system/df -> foto del motor:
+    {"containers": {nombre: uso}, "images": {id: tamaño}, "volumes": {nombre: tamaño}}"""
+    images = {i["Id"]: _size(i.get("Size")) for i in df.get("Images") or []}
+    volumes = {v["Name"]: _size((v.get("UsageData") or {}).get("Size")) for v in df.get("Volumes") or []}
+    containers = {}
+    for c in df.get("Containers") or []:
+        names = c.get("Names") or [c.get("Id", "")[:12]]
+        containers[names[0].lstrip("/")] = {
+            "image": c.get("Image"),
+            "image_id": c.get("ImageID"),
+            "image_size": images.get(c.get("ImageID")),
+            "size_rw": _size(c.get("SizeRw")),
+            "size_root_fs": _size(c.get("SizeRootFs")),
+            "mounts": parse_mounts(c.get("Mounts"), volumes),
+        }
+    return {"containers": containers, "images": images, "volumes": volumes,
+            "layers_size": _size(df.get("LayersSize"))}
+
+
+def _footprint(usage):
+    """Lo que ocupa un contenedor por sí mismo: capa escribible + sus volúmenes"""
+    volumes = sum(m["size"] or 0 for m in usage["mounts"] if m["type"] == "volume")
+    return (usage["size_rw"] or 0) + volumes
+
+
+class DiskUsageIndex:
+    """Caché del uso de disco por motor (una llamada a /system/df cada vez).
+
+    df es caro en hosts con muchas imágenes o volúmenes, así que nunca se
+    llama desde una petición: las lecturas devuelven la última foto y, si
+    tiene más de ttl segundos, piden otra en segundo plano. refresh() fuerza
+    una nueva. Cada motor se refresca por separado y uno lento no retrasa
+    a los demás.
+    """
+
+    def __init__(self, registry, ttl=DISK_TTL, on_refresh=None):
+        self.registry = registry
+        self.ttl = ttl
+        self.on_refresh = on_refresh  # on_refresh(motor, estado) al terminar cada refresco
+        self._lock = threading.Lock()
+        self._snapshots = {}    # motor -> foto de parse_df()
+        self._updated = {}      # motor -> time.time() de la foto
+        self._errors = {}       # motor -> error del último refresco
+        self._refreshing = {}   # motor -> Event que se marca al terminar
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.registry.add_listener(self._on_change)
+        self.refresh()
+
+    def _on_change(self, entry):
+        # Un contenedor borrado deja de contar en cuanto llega el evento
+        if not entry.get("deleted"):
+            return
+        try:
+            engine, name = self.registry.resolve(entry["name"])
+        except KeyError:
+            return
+        with self._lock:
+            snapshot = self._snapshots.get(engine.name)
+            if snapshot:
+                snapshot["containers"].pop(name, None)
+
+    # --- Refresco ---
+    def refresh(self, engines=None):
+        """Pide una foto nueva a los motores (en segundo plano); devuelve los
+        Event de los refrescos en curso para quien quiera esperarlos"""
+        waiting = []
+        for engine in engines or self.registry:
+            with self._lock:
+                done = self._refreshing.get(engine.name)
+                if done is None:
+                    done = self._refreshing[engine.name] = threading.Event()
+                    threading.Thread(target=self._refresh_one, args=(engine, done),
+                                     name=f"j5d-disk-{engine.name}", daemon=True).start()
+            waiting.append(done)
+        return waiting
+
+    def _refresh_one(self, engine, done):
+        try:
+            snapshot = parse_df(engine.client.api.df())
+            with self._lock:
+                self._snapshots[engine.name] = snapshot
+                self._updated[engine.name] = time.time()
+                self._errors.pop(engine.name, None)
+        except Exception as e:
+            with self._lock:
+                self._errors[engine.name] = str(e)
+            print(f"⚠️  No se pudo leer el uso de disco del motor '{engine.name}': {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(engine.name, None)
+            done.set()
+        if self.on_refresh:
+            try:
+                self.on_refresh(engine.name, self.status()[engine.name])
+            except Exception as e:
+                print(f"⚠️  Error notificando el uso de disco: {e}")
+
+    def wait(self, timeout, engines=None):
+        """refresh() y espera como mucho timeout segundos a que termine"""
+        deadline = time.monotonic() + timeout
+        for done in self.refresh(engines):
+            done.wait(max(0, deadline - time.monotonic()))
+
+    def ensure_fresh(self):
+        """Lanza (sin esperar) el refresco de los motores con la foto caducada"""
+        now = time.time()
+        with self._lock:
+            expired = [e for e in self.registry if now - self._updated.get(e.name, 0) >= self.ttl]
+            stale = [e for e in expired if e.name not in self._refreshing]
+        telemetry.cache("disk_usage", "miss" if expired else "hit")
+        if stale:
+            self.refresh(stale)
+
+    # --- Lectura ---
+    def status(self):
+        """Estado de la foto de cada motor"""
+        now = time.time()
+        with self._lock:
+            out = {}
+            for engine in self.registry:
+                updated = self._updated.get(engine.name)
+                snapshot = self._snapshots.get(engine.name) or {}
+                out[engine.name] = {
+                    "updated": updated,
+                    "age": round(now - updated, 1) if updated else None,
+                    "stale": updated is None or now - updated >= self.ttl,
+                    "refreshing": engine.name in self._refreshing,
+                    "error": self._errors.get(engine.name),
+                    "images": sum(s or 0 for s in snapshot.get("images", {}).values()),
+                    "volumes": sum(s or 0 for s in snapshot.get("volumes", {}).values()),
+                    "containers": sum((c["size_rw"] or 0) for c in snapshot.get("containers", {}).values()),
+                    "layers_size": snapshot.get("layers_size"),
+                }
+            return out
+
+    def container(self, ref):
+        """Uso de disco del contenedor, o None si no está en la foto"""
+        engine, name = self.registry.resolve(ref)
+        with self._lock:
+            usage = (self._snapshots.get(engine.name) or {}).get("containers", {}).get(name)
+            if usage is None:
+                return None
+            return {"name": ref, "engine": engine.name, **usage, "footprint": _footprint(usage)}
+
+    def containers(self, limit=DEFAULT_TOP):
+        """Los contenedores que más ocupan (capa escribible + volúmenes)"""
+        items = []
+        with self._lock:
+            for engine in self.registry:
+                for name, usage in (self._snapshots.get(engine.name) or {}).get("containers", {}).items():
+                    ref = self.registry.ref(engine, name)
+                    items.append({"name": ref, "engine": engine.name, **usage, "footprint": _footprint(usage)})
+        items.sort(key=lambda c: (-c["footprint"], c["name"]))
+        return items[:limit] if limit else items
+
+    def project(self, members):
+        """Uso agregado de un proyecto. Imágenes y volúmenes compartidos por
+        varios contenedores se cuentan una sola vez."""
+        containers, missing = {}, []
+        images, volumes, binds = {}, {}, set()
+        writable = 0
+        for ref in members:
+            try:
+                usage = self.container(ref)
+            except KeyError:
+                usage = None  # motor desconocido: cuenta como que falta
+            if usage is None:
+                missing.append(ref)
+                continue
+            containers[ref] = usage
+            writable += usage["size_rw"] or 0
+            if usage["image_id"]:
+                images[(usage["engine"], usage["image_id"])] = usage["image_size"] or 0
+            for m in usage["mounts"]:
+                if m["type"] == "volume":
+                    volumes[(usage["engine"], m["name"])] = m["size"] or 0
+                elif m["type"] == "bind":
+                    binds.add(m["source"])
+        totals = {"writable": writable, "images": sum(images.values()), "volumes": sum(volumes.values())}
+        totals["total"] = sum(totals.values())
+        return {"containers": containers, "missing": missing, "binds": sorted(binds), "totals": totals}
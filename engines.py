@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+
+from container_index import ContainerIndex
+from telemetry import instrument_docker
+
+# Motores Docker a gestionar: "nombre=url,nombre2=url2". Sin definir se usa un
+# único motor "local" configurado como siempre (DOCKER_HOST, socket por defecto...)
+ENGINES = os.environ.get("J5D_ENGINES", "")
+# Tiempo máximo que /api/data espera a un motor que todavía no ha respondido
+ENGINE_BUDGET = float(os.environ.get("J5D_ENGINE_BUDGET", "2"))
+# Conexiones HTTP que se reutilizan por motor
+POOL_SIZE = int(os.environ.get("J5D_POOL_SIZE", "10"))
+
+
+def parse_engines(spec):
+    """"local=unix:///var/run/docker.sock,prod=tcp://10.0.0.5:2375" -> [(nombre, url)]"""
+    engines = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, url = item.partition("=")
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f"Motor mal definido en J5D_ENGINES: '{item}' (usa nombre=url)")
+        engines.append((name.strip(), url.strip()))
+    return engines or [("local", None)]
+
+
+class Engine:
+    """Un motor Docker: su cliente (con pool de conexiones) y su índice de contenedores"""
+
+    def __init__(self, name, url=None):
+        self.name = name
+        self.url = url
+        self._lock = threading.Lock()
+        self._client = None
+        self._index = None
+        self._starting = False
+        self._listeners = []
+        self.ready = threading.Event()
+        self.error = None
+
+    def make_client(self, pool_size=POOL_SIZE):
+        import docker
+        if self.url:
+            client = docker.DockerClient(base_url=self.url, max_pool_size=pool_size)
+        else:
+            client = docker.from_env(max_pool_size=pool_size)
+        # Latencia de cada llamada al daemon por operación (/metrics)
+        instrument_docker(client.api, self.name)
+        return client
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self.make_client()
+            return self._client
+
+    @property
+    def index(self):
+        client = self.client
+        with self._lock:
+            if self._index is None:
+                self._index = ContainerIndex(client)
+                for callback in self._listeners:
+                    self._index.add_listener(callback)
+            return self._index
+
+    def add_listener(self, callback):
+        # Se guarda aquí para no conectar con el motor antes de tiempo
+        with self._lock:
+            self._listeners.append(callback)
+            if self._index is not None:
+                self._index.add_listener(callback)
+
+    def start_async(self):
+        """Arranca el índice en segundo plano; un motor lento no bloquea a los demás"""
+        with self._lock:
+            if self._starting:
+                return
+            self._starting = True
+        threading.Thread(target=self._start, name=f"j5d-engine-{self.name}", daemon=True).start()
+
+    def _start(self):
+        while True:
+            try:
+                self.index.start()
+                self.error = None
+                self.ready.set()
+                return
+            except Exception as e:
+                self.error = str(e)
+                print(f"⚠️  Motor '{self.name}' no disponible: {e}")
+            time.sleep(5)
+
+    def status(self):
+        if self.ready.is_set():
+            return {"status": "ok"}
+        return {"status": "error" if self.error else "pending", "error": self.error}
+
+
+class EngineRegistry:
+    """Motores con nombre. Los contenedores se referencian como "motor:nombre";
+    un nombre sin prefijo es del motor por defecto (el primero)."""
+
+    def __init__(self, spec=ENGINES):
+        self.engines = {name: Engine(name, url) for name, url in parse_engines(spec)}
+        self.default = next(iter(self.engines.values()))
+        # Se avisa con cada cambio de contenedor a quien espera en wait_until()
+        self._changed = threading.Condition()
+        self.add_listener(self._on_change)
+
+    def __iter__(self):
+        return iter(self.engines.values())
+
+    def __len__(self):
+        return len(self.engines)
+
+    # --- Referencias a contenedores ---
+    def resolve(self, ref):
+        """"motor:contenedor" -> (Engine, contenedor)"""
+        engine_name, sep, name = ref.partition(":")
+        if not sep:
+            return self.default, ref
+        if engine_name not in self.engines:
+            raise KeyError(f"Motor desconocido: {engine_name}")
+        return self.engines[engine_name], name
+
+    def ref(self, engine, name):
+        return name if engine is self.default else f"{engine.name}:{name}"
+
+    def _qualify(self, engine, entry):
+        return {**entry, "name": self.ref(engine, entry["name"]), "engine": engine.name}
+
+    # --- Ciclo de vida ---
+    def start(self, budget=0):
+        for engine in self:
+            engine.start_async()
+        self.wait(budget)
+
+    def wait(self, budget):
+        """Espera como mucho budget segundos (en total) a los motores pendientes.
+        Los que ya fallaron no se esperan: siguen reintentando en segundo plano."""
+        deadline = time.monotonic() + budget
+        for engine in self:
+            if engine.error is None:
+                engine.ready.wait(max(0, deadline - time.monotonic()))
+
+    def refresh(self, engines=None):
+        """Listado puntual de los motores indicados, en paralelo (modo directo)"""
+        def refresh_one(engine):
+            try:
+                engine.index.refresh()
+            except Exception as e:
+                engine.error = str(e)
+
+        threads = [threading.Thread(target=refresh_one, args=(e,)) for e in (engines or self)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def add_listener(self, callback):
+        for engine in self:
+            engine.add_listener(lambda entry, engine=engine: callback(self._qualify(engine, entry)))
+
+    def _on_change(self, entry):
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_until(self, ref, check, timeout):
+        """Espera, sin sondear al daemon, a que check(entrada) devuelva algo
+        verdadero con los cambios que llegan por eventos. Devuelve ese valor, o
+        el último (falso) si se agota el tiempo."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                outcome = check(self.get(ref))
+                remaining = deadline - time.monotonic()
+                if outcome or remaining <= 0:
+                    return outcome
+                self._changed.wait(remaining)
+
+    # --- Lectura combinada ---
+    def statuses(self):
+        return {engine.name: engine.status() for engine in self}
+
+    def list(self):
+        containers = []
+        for engine in self:
+            if engine.ready.is_set():
+                containers += [self._qualify(engine, e) for e in engine.index.list()]
+        return containers
+
+    def get(self, ref):
+        engine, name = self.resolve(ref)
+        if engine._index is None:
+            return None
+        entry = engine.index.get(name)
+        return self._qualify(engine, entry) if entry else None
+
+    def version(self):
+        """Cursor con la versión del índice de cada motor, en orden"""
+        return ".".join(str(engine._index.version if engine.ready.is_set() else 0) for engine in self)
+
+    def changes_since(self, cursor):
+        """(cambiados, borrados) de todos los motores, o None si hace falta todo"""
+        versions = cursor.split(".")
+        if len(versions) != len(self.engines):
+            return None
+        changed, deleted = [], []
+        for engine, version in zip(self, versions):
+            if not engine.ready.is_set():
+                # Un motor que sigue caído no aporta nada; uno que se cayó después, sí
+                if version != "0":
+                    return None
+                continue
+            changes = engine.index.changes_since(int(version))
+            if changes is None:
+                return None
+            changed += [self._qualify(engine, e) for e in changes[0]]
+            deleted += [self.ref(engine, name) for name in changes[1]]
+        return changed, deleted
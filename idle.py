@@ -0,0 +1,219 @@
+import calendar
+import os
+import threading
+import time
+
+# Cada cuántos segundos se revisan las políticas de inactividad
+CHECK_INTERVAL = int(os.environ.get("J5D_IDLE_INTERVAL", "60"))
+# Con J5D_IDLE_DRY_RUN=1 nunca se actúa: solo se registra lo que se habría hecho
+DRY_RUN = os.environ.get("J5D_IDLE_DRY_RUN", "0") == "1"
+
+IDLE_ACTIONS = ("stop", "suspend")
+SCOPES = ("project", "containers")
+# Umbrales por defecto cuando la política solo indica los minutos
+DEFAULT_CPU_BELOW = 2.0     # % de CPU
+DEFAULT_NET_BELOW = 1024.0  # bytes/s de red (entrada + salida)
+
+
+def validate_policy(req):
+    """Cuerpo de la API -> política completa. Lanza ValueError si no es válida.
+
+    {"action": "stop"|"suspend", "scope": "project"|"containers",
+     "idle_minutes": 30, "cpu_below": 2, "net_below": 1024,
+     "ttl_minutes": 480, "dry_run": false}
+    """
+    policy = {
+        "action": req.get("action", "stop"),
+        "scope": req.get("scope", "project"),
+        "idle_minutes": req.get("idle_minutes"),
+        "cpu_below": req.get("cpu_below"),
+        "net_below": req.get("net_below"),
+        "ttl_minutes": req.get("ttl_minutes"),
+        "dry_run": bool(req.get("dry_run", False)),
+    }
+    if policy["action"] not in IDLE_ACTIONS:
+        raise ValueError(f"action debe ser {' o '.join(IDLE_ACTIONS)}")
+    if policy["scope"] not in SCOPES:
+        raise ValueError(f"scope debe ser {' o '.join(SCOPES)}")
+    for key in ("idle_minutes", "cpu_below", "net_below", "ttl_minutes"):
+        value = policy[key]
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0):
+            raise ValueError(f"{key} debe ser un número positivo o null")
+    if not policy["idle_minutes"] and not policy["ttl_minutes"]:
+        raise ValueError("Indica idle_minutes, ttl_minutes o ambos")
+    if policy["idle_minutes"]:
+        if policy["cpu_below"] is None:
+            policy["cpu_below"] = DEFAULT_CPU_BELOW
+        if policy["net_below"] is None:
+            policy["net_below"] = DEFAULT_NET_BELOW
+    return policy
+
+
+def parse_started_at(value):
+    """State.StartedAt del daemon ("2024-05-01T10:00:00.123456789Z") -> epoch, o None"""
+    try:
+        seconds = calendar.timegm(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S"))
+    except (TypeError, ValueError):
+        return None
+    fraction = value[19:].rstrip("Z").split("+")[0]
+    if fraction.startswith(".") and fraction[1:].isdigit():
+        seconds += float(fraction)
+    # Un contenedor que nunca arrancó trae "0001-01-01T00:00:00Z"
+    return seconds if seconds > 0 else None
+
+
+class IdleScheduler:
+    """Detiene o suspende proyectos (o sus contenedores) inactivos.
+
+    La inactividad sale de la historia del recolector de métricas (CPU y red
+    por debajo de los umbrales durante idle_minutes) y el TTL del State.StartedAt
+    de cada contenedor (se pide al daemon la primera vez que se le ve en marcha).
+    Cada acción, real o simulada (dry run), queda registrada en el store.
+    """
+
+    def __init__(self, registry, store, metrics, run_action, interval=CHECK_INTERVAL, dry_run=DRY_RUN):
+        self.registry = registry
+        self.store = store
+        self.metrics = metrics
+        self.run_action = run_action  # run_action(acción, proyecto, contenedores o None) -> resultados
+        self.interval = interval
+        self.dry_run = dry_run
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()  # check() corre desde _loop y desde la API
+        self._running_since = {}  # ref -> StartedAt (None hasta que se pregunta al daemon)
+        self._flagged = set()     # (proyecto, contenedores) ya registrados en dry run
+        self._stopped = threading.Event()
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.registry.add_listener(self._on_change)
+        for entry in self.registry.list():
+            self._on_change(entry)
+        threading.Thread(target=self._loop, name="j5d-idle", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _on_change(self, entry):
+        with self._lock:
+            if entry.get("status") == "running":
+                self._running_since.setdefault(entry["name"], None)
+            else:
+                self._running_since.pop(entry["name"], None)
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"⚠️  Error revisando proyectos inactivos: {e}")
+
+    # --- Evaluación ---
+    def _idle_for(self, ref, since, minutes, cpu_below, net_below):
+        """True si toda la historia de los últimos minutos está por debajo de los umbrales"""
+        window_start = time.time() - minutes * 60
+        # Un contenedor que no lleva en marcha toda la ventana no está inactivo (aún)
+        if since > window_start:
+            return False
+        # El nivel más fino que cubre la ventana (1s: 5 min, 1m: 4 h)
+        tier = "1s" if minutes <= 5 else "1m" if minutes <= 240 else "1h"
+        history = self.metrics.container(ref, tier)
+        if not history:
+            return False
+        series, interval = history["series"], history["interval"]
+        if not series["t"] or series["t"][0] > window_start:
+            return False
+        for t, cpu, rx, tx in zip(series["t"], series["cpu"], series["net_rx"], series["net_tx"]):
+            if t + interval > window_start and (cpu >= cpu_below or rx + tx >= net_below):
+                return False
+        return True
+
+    def _started_at(self, ref):
+        """Desde cuándo está en marcha según el daemon (se guarda hasta que pare)"""
+        with self._lock:
+            since = self._running_since.get(ref)
+        if since is not None:
+            return since
+        try:
+            engine, name = self.registry.resolve(ref)
+            since = parse_started_at(engine.client.api.inspect_container(name)["State"].get("StartedAt"))
+        except Exception as e:
+            print(f"⚠️  No se pudo leer el arranque de {ref}: {e}")
+            since = None
+        if since is None:
+            return time.time()
+        with self._lock:
+            if ref in self._running_since:
+                self._running_since[ref] = since
+        return since
+
+    def _reason(self, refs, policy):
+        """Motivo por el que estos contenedores se deben apagar, o None"""
+        now = time.time()
+        since = [self._started_at(ref) for ref in refs]
+        if policy["ttl_minutes"] and now - min(since) >= policy["ttl_minutes"] * 60:
+            return f"en marcha más de {policy['ttl_minutes']:g} min (TTL)"
+        if policy["idle_minutes"] and all(
+            self._idle_for(ref, ref_since, policy["idle_minutes"], policy["cpu_below"], policy["net_below"])
+            for ref, ref_since in zip(refs, since)
+        ):
+            return (f"inactivo {policy['idle_minutes']:g} min (CPU < {policy['cpu_below']:g}%, "
+                    f"red < {policy['net_below']:g} B/s)")
+        return None
+
+    def check(self):
+        """Revisa todas las políticas una vez; devuelve las acciones decididas"""
+        with self._check_lock:
+            return self._check()
+
+    def _check(self):
+        decisions = []
+        for project, policy in self.store.idle_policies().items():
+            members = self.store.get_project(project) or []
+            running = [ref for ref in members if (self._get(ref) or {}).get("status") == "running"]
+            if not running:
+                continue
+            if policy["scope"] == "project":
+                groups = [running]
+            else:
+                groups = [[ref] for ref in running]
+            for refs in groups:
+                reason = self._reason(refs, policy)
+                key = (project, tuple(refs))
+                if reason is None:
+                    self._flagged.discard(key)
+                    continue
+                decisions.append(self._act(project, refs if policy["scope"] == "containers" else None,
+                                           refs, policy, reason, key))
+        return [d for d in decisions if d]
+
+    def _get(self, ref):
+        try:
+            return self.registry.get(ref)
+        except KeyError:
+            return None
+
+    def _act(self, project, containers, refs, policy, reason, key):
+        dry_run = self.dry_run or policy["dry_run"]
+        action = policy["action"]
+        if dry_run:
+            # En dry run se registra una vez por racha de inactividad, no en cada revisión
+            if key in self._flagged:
+                return None
+            self._flagged.add(key)
+            self.store.log_idle_action(project, refs, action, reason, dry_run=True)
+            print(f"💤 [dry run] {action} {project} ({', '.join(refs)}): {reason}")
+            return {"project": project, "containers": refs, "action": action, "dry_run": True}
+        print(f"💤 {action} {project} ({', '.join(refs)}): {reason}")
+        try:
+            results = self.run_action(action, project, containers)
+            failed = [f"{r['container']}: {r['error']}" for r in results if not r["ok"]]
+            error = "; ".join(failed) or None
+        except Exception as e:
+            error = str(e)
+        self.store.log_idle_action(project, refs, action, reason, dry_run=False, ok=error is None, error=error)
+        return {"project": project, "containers": refs, "action": action, "dry_run": False, "error": error}
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Operaciones de lotes que se ejecutan a la vez (compartido por todos los jobs)
+JOB_WORKERS = int(os.environ.get("J5D_JOB_WORKERS", "8"))
+# Jobs terminados que se recuerdan para consultar su resultado
+MAX_JOBS = 200
+
+
+class Job:
+    """Un lote de operaciones con el progreso de cada una"""
+
+    def __init__(self, items):
+        self.id = uuid.uuid4().hex[:12]
+        self.created = time.time()
+        self.finished = None
+        self.items = [{**item, "index": i, "status": "pending", "error": None, "elapsed_ms": None}
+                      for i, item in enumerate(items)]
+        self._pending = len(items)
+
+    @property
+    def status(self):
+        if self.finished is not None:
+            return "done"
+        return "running" if any(i["status"] != "pending" for i in self.items) else "pending"
+
+    def to_dict(self, items=True):
+        counts = {}
+        for item in self.items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        job = {
+            "id": self.id,
+            "status": self.status,
+            "created": self.created,
+            "finished": self.finished,
+            "total": len(self.items),
+            "counts": counts,
+            "success": self.finished is not None and counts.get("error", 0) == 0,
+        }
+        if items:
+            job["items"] = [dict(i) for i in self.items]
+        return job
+
+
+class JobManager:
+    """Ejecuta lotes en un pool compartido y guarda su progreso en memoria.
+
+    run_item(item) hace la operación y devuelve un dict opcional que se añade
+    al resultado del elemento; si lanza una excepción, el elemento queda en
+    error. on_update(job, item) se llama cada vez que cambia un elemento, con
+    el resumen del job (sin la lista de elementos) y el elemento.
+    """
+
+    def __init__(self, run_item, workers=JOB_WORKERS, max_jobs=MAX_JOBS, on_update=None):
+        self.run_item = run_item
+        self.max_jobs = max_jobs
+        self.on_update = on_update
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="j5d-jobs")
+        self._lock = threading.Lock()
+        self._jobs = {}  # id -> Job, del más antiguo al más reciente
+
+    def submit(self, items):
+        job = Job(items)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        for item in job.items:
+            self._executor.submit(self._run, job, item)
+        if not job.items:
+            job.finished = time.time()
+        return job
+
+    def _evict(self):
+        # Se olvidan los jobs terminados más antiguos; los que siguen en marcha nunca
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [j.id for j in self._jobs.values() if j.finished is not None][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def _run(self, job, item):
+        start = time.perf_counter()
+        with self._lock:
+            item["status"] = "running"
+        self._notify(job, item)
+        try:
+            extra = self.run_item(item) or {}
+            error = extra.pop("error", None)
+        except Exception as e:
+            extra, error = {}, str(e)
+        with self._lock:
+            item.update(extra)
+            item["status"] = "error" if error else "ok"
+            item["error"] = error
+            item["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            job._pending -= 1
+            if job._pending == 0:
+                job.finished = time.time()
+        self._notify(job, item)
+
+    def _notify(self, job, item):
+        if self.on_update:
+            try:
+                with self._lock:
+                    summary, item = job.to_dict(items=False), dict(item)
+                self.on_update(summary, item)
+            except Exception as e:
+                print(f"⚠️  Error notificando el job {job.id}: {e}")
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def list(self):
+        with self._lock:
+            return [job.to_dict(items=False) for job in reversed(self._jobs.values())]
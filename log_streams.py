@@ -0,0 +1,266 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+
+# Líneas pendientes por cliente; si no las lee a tiempo se descartan (con aviso)
+MAX_PENDING = int(os.environ.get("J5D_LOG_BUFFER", "1000"))
+# Líneas de historia por contenedor si no se pide ?tail=
+DEFAULT_TAIL = 100
+# Cada cuánto se manda un comentario para mantener viva la conexión SSE
+HEARTBEAT = 15
+# Lo que se espera a que un contenedor parado vuelva a arrancar antes de comprobarlo otra vez
+RESTART_WAIT = 30
+
+DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_since(value):
+    """"1718000000" (unix) o "30s"/"5m"/"2h"/"1d" (hace cuánto) -> timestamp"""
+    if value is None or value == "":
+        return None
+    match = DURATION.match(value)
+    if match:
+        return time.time() - float(match.group(1)) * UNITS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"since inválido: {value} (usa un timestamp o 30s, 5m, 2h...)")
+
+
+def parse_tail(value):
+    if value is None or value == "":
+        return DEFAULT_TAIL
+    if value == "all":
+        return "all"
+    try:
+        return max(0, int(value))
+    except ValueError:
+        raise ValueError(f"tail inválido: {value} (usa un número o 'all')")
+
+
+def split_timestamp(line):
+    """"2024-06-10T12:00:00.000000000Z texto" -> (timestamp, texto)"""
+    ts, sep, text = line.partition(" ")
+    return (ts, text) if sep else ("", line)
+
+
+class _LineSplitter:
+    """Junta los trozos del stream del daemon y devuelve líneas completas"""
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, chunk):
+        data = self._pending + chunk
+        *lines, self._pending = data.split(b"\n")
+        return [line.decode("utf-8", "replace").rstrip("\r") for line in lines]
+
+
+class Viewer:
+    """Cola acotada de un cliente que mira los logs de uno o varios contenedores"""
+
+    def __init__(self, maxsize=MAX_PENDING):
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Cliente lento: se descarta en lugar de acumular en memoria
+            with self._lock:
+                self.dropped += 1
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def take_dropped(self):
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+            return dropped
+
+
+class LogSource:
+    """Un único stream de logs del daemon por contenedor, compartido por todos
+    los clientes que lo miran. Empieza con el primero y se cierra con el último."""
+
+    def __init__(self, hub, ref):
+        self.hub = hub
+        self.ref = ref
+        self._viewers = set()
+        self._stream = None
+        self._stopped = threading.Event()
+
+    def add(self, viewer):
+        self._viewers.add(viewer)
+        if len(self._viewers) == 1:
+            self._stopped.clear()
+            threading.Thread(target=self._run, name=f"j5d-logs-{self.ref}", daemon=True).start()
+
+    def remove(self, viewer):
+        """Devuelve True si ya no queda nadie mirando"""
+        self._viewers.discard(viewer)
+        if self._viewers:
+            return False
+        self._stopped.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+        return True
+
+    def _publish(self, item):
+        with self.hub._lock:
+            viewers = list(self._viewers)
+        for viewer in viewers:
+            viewer.put(item)
+
+    def _run(self):
+        registry = self.hub.registry
+        try:
+            engine, name = registry.resolve(self.ref)
+        except KeyError as e:
+            self._publish((self.ref, None, f"❌ {e.args[0]}"))
+            return
+        stopped = self._stopped
+        delay = 1
+        while not stopped.is_set():
+            try:
+                # tail=0: la historia la pide cada cliente; aquí solo lo nuevo
+                self._stream = engine.client.api.logs(name, stream=True, follow=True, timestamps=True, tail=0)
+                if stopped.is_set():
+                    self._stream.close()
+                    break
+                splitter = _LineSplitter()
+                delay = 1
+                for chunk in self._stream:
+                    for line in splitter.feed(chunk):
+                        ts, text = split_timestamp(line)
+                        self._publish((self.ref, ts, text))
+            except Exception as e:
+                if stopped.is_set():
+                    break
+                self._publish((self.ref, None, f"⚠️  Stream de logs interrumpido: {e}"))
+                delay = min(delay * 2, RESTART_WAIT)
+            finally:
+                self._stream = None
+            if stopped.is_set():
+                break
+            # El contenedor se paró: se espera a que vuelva a arrancar por eventos, sin sondear
+            registry.wait_until(
+                self.ref, lambda entry: stopped.is_set() or (entry or {}).get("status") == "running", RESTART_WAIT
+            )
+            # Y un respiro (creciente si falla) para no reconectar en bucle
+            if stopped.wait(delay):
+                break
+
+
+class LogHub:
+    """Logs en vivo de contenedores y proyectos: historia por cliente
+    (?tail=/?since=) y después las líneas nuevas del stream compartido"""
+
+    def __init__(self, registry, max_pending=MAX_PENDING):
+        self.registry = registry
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._sources = {}  # ref -> LogSource
+
+    def subscribe(self, refs):
+        viewer = Viewer(self.max_pending)
+        with self._lock:
+            for ref in refs:
+                source = self._sources.get(ref)
+                if source is None:
+                    source = self._sources[ref] = LogSource(self, ref)
+                source.add(viewer)
+        return viewer
+
+    def unsubscribe(self, viewer, refs):
+        with self._lock:
+            for ref in refs:
+                source = self._sources.get(ref)
+                if source is not None and source.remove(viewer):
+                    del self._sources[ref]
+
+    def count(self):
+        """Streams de logs abiertos con los daemons"""
+        with self._lock:
+            return len(self._sources)
+
+    def history(self, ref, tail=DEFAULT_TAIL, since=None):
+        """[(ref, timestamp, texto)] ya escritas (petición sin follow)"""
+        engine, name = self.registry.resolve(ref)
+        kwargs = {"since": since} if since else {}
+        raw = engine.client.api.logs(name, stream=False, follow=False, timestamps=True, tail=tail, **kwargs)
+        return [(ref, *split_timestamp(line)) for line in _LineSplitter().feed(raw + b"\n") if line]
+
+    def lines(self, refs, tail=DEFAULT_TAIL, since=None, heartbeat=HEARTBEAT):
+        """Generador de (ref, timestamp, texto), o None cada heartbeat segundos
+        sin líneas. Con varios contenedores la historia se mezcla por hora."""
+        viewer = self.subscribe(refs)
+        try:
+            # Suscritos antes de leer la historia: lo que llegue mientras tanto
+            # queda en la cola y se descarta si ya salió en la historia
+            history, last = [], {}
+            for ref in refs:
+                try:
+                    lines = self.history(ref, tail, since)
+                except Exception as e:
+                    lines = [(ref, None, f"❌ {e}")]
+                history += lines
+                last[ref] = max((ts for _, ts, _ in lines if ts), default="")
+            if len(refs) > 1:
+                history.sort(key=lambda item: item[1] or "")
+            yield from history
+            while True:
+                item = viewer.get(heartbeat)
+                dropped = viewer.take_dropped()
+                if dropped:
+                    yield (None, None, f"⚠️  {dropped} líneas descartadas (el cliente no las leía a tiempo)")
+                if item is None:
+                    yield None
+                    continue
+                ref, ts, _ = item
+                if ts and ts <= last.get(ref, ""):
+                    continue
+                yield item
+        finally:
+            self.unsubscribe(viewer, refs)
+
+
+def format_text(lines, prefix=False, timestamps=False):
+    """Texto plano (una línea por línea de log), para curl o la terminal"""
+    width = 0
+    for item in lines:
+        if item is None:
+            # Hay que escribir algo para notar que el cliente se fue (un chunk
+            # vacío no llega a enviarse): una línea en blanco en cada heartbeat
+            yield "\n"
+            continue
+        ref, ts, text = item
+        parts = []
+        if prefix and ref:
+            width = max(width, len(ref))
+            parts.append(f"{ref.ljust(width)} |")
+        if timestamps and ts:
+            parts.append(ts)
+        parts.append(text)
+        yield " ".join(parts) + "\n"
+
+
+def format_sse(lines):
+    """text/event-stream: un evento "log" por línea"""
+    yield "retry: 3000\n\n"
+    for item in lines:
+        if item is None:
+            yield ": ping\n\n"
+            continue
+        ref, ts, text = item
+        yield f"event: log\ndata: {json.dumps({'container': ref, 'ts': ts, 'line': text})}\n\n"
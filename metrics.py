@@ -0,0 +1,294 @@
+import os
+import threading
+import time
+from array import array
+
+# Recolección de CPU/memoria/red en segundo plano (J5D_METRICS=0 la desactiva)
+METRICS_ENABLED = os.environ.get("J5D_METRICS", "1") != "0"
+# Streams de stats abiertos a la vez como máximo (uno por contenedor en marcha)
+MAX_STREAMS = int(os.environ.get("J5D_METRICS_MAX_STREAMS", "200"))
+# Espera antes de reabrir un stream de stats que se cortó
+RETRY_DELAY = 5
+
+FIELDS = ("cpu", "mem", "net_rx", "net_tx")
+# Niveles de historia: (nombre, segundos por punto, puntos guardados)
+TIERS = (
+    ("1s", 1, 300),     # 5 minutos
+    ("1m", 60, 240),    # 4 horas
+    ("1h", 3600, 168),  # 7 días
+)
+
+
+class RingBuffer:
+    """Serie de tamaño fijo sobre arrays de double: una columna por campo"""
+
+    def __init__(self, capacity, fields=FIELDS):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.columns = {f: array("d", bytes(8 * capacity)) for f in fields}
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, ts, values):
+        if self._size < self.capacity:
+            i = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            # Lleno: se pisa el punto más antiguo
+            i = self._start
+            self._start = (self._start + 1) % self.capacity
+        self.times[i] = ts
+        for f, column in self.columns.items():
+            column[i] = values[f]
+
+    def points(self, limit=None):
+        """[(ts, {campo: valor})] del más antiguo al más reciente"""
+        n = self._size if limit is None else min(limit, self._size)
+        first = self._start + self._size - n
+        out = []
+        for k in range(first, first + n):
+            i = k % self.capacity
+            out.append((self.times[i], {f: c[i] for f, c in self.columns.items()}))
+        return out
+
+
+class Tier:
+    """Un nivel de la historia: promedia las muestras de cada intervalo"""
+
+    def __init__(self, name, interval, capacity):
+        self.name = name
+        self.interval = interval
+        self.ring = RingBuffer(capacity)
+        self._bucket = None
+        self._sums = dict.fromkeys(FIELDS, 0.0)
+        self._count = 0
+
+    def add(self, ts, values):
+        bucket = ts - ts % self.interval
+        if self._bucket is not None and bucket != self._bucket:
+            self.ring.append(self._bucket, self._average())
+            self._sums = dict.fromkeys(FIELDS, 0.0)
+            self._count = 0
+        self._bucket = bucket
+        for f in FIELDS:
+            self._sums[f] += values[f]
+        self._count += 1
+
+    def _average(self):
+        return {f: s / self._count for f, s in self._sums.items()}
+
+    def points(self, limit=None):
+        # El intervalo en curso se incluye (parcial) para que el último punto no se quede atrás
+        points = self.ring.points(limit)
+        if self._count:
+            points.append((self._bucket, self._average()))
+        return points[-limit:] if limit else points
+
+
+class ContainerMetrics:
+    """Historia de un contenedor en todos los niveles"""
+
+    def __init__(self):
+        self.tiers = {name: Tier(name, interval, capacity) for name, interval, capacity in TIERS}
+        self.latest = None
+
+    def add(self, ts, values):
+        for tier in self.tiers.values():
+            tier.add(ts, values)
+        self.latest = {"t": ts, **values}
+
+
+def parse_stats(raw, previous=None):
+    """Muestra de /containers/{id}/stats -> {"cpu" (%), "mem" (bytes), "net_rx",
+    "net_tx" (bytes/s)} y los contadores de red para calcular la siguiente"""
+    cpu = raw.get("cpu_stats") or {}
+    precpu = raw.get("precpu_stats") or {}
+    cpu_delta = (cpu.get("cpu_usage") or {}).get("total_usage", 0) - (precpu.get("cpu_usage") or {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    cpus = cpu.get("online_cpus") or len((cpu.get("cpu_usage") or {}).get("percpu_usage") or []) or 1
+    cpu_percent = cpu_delta / system_delta * cpus * 100 if system_delta > 0 and cpu_delta > 0 else 0.0
+
+    # Igual que "docker stats": sin la caché de páginas (cgroup v2: inactive_file, v1: cache)
+    memory = raw.get("memory_stats") or {}
+    mem_stats = memory.get("stats") or {}
+    mem = max(0, memory.get("usage", 0) - mem_stats.get("inactive_file", mem_stats.get("cache", 0)))
+
+    networks = (raw.get("networks") or {}).values()
+    counters = (time.monotonic(), sum(n.get("rx_bytes", 0) for n in networks), sum(n.get("tx_bytes", 0) for n in networks))
+    rx_rate = tx_rate = 0.0
+    if previous:
+        elapsed = counters[0] - previous[0]
+        if elapsed > 0:
+            # Un contador que baja (reinicio del contenedor) no da tasas negativas
+            rx_rate = max(0, counters[1] - previous[1]) / elapsed
+            tx_rate = max(0, counters[2] - previous[2]) / elapsed
+    return {"cpu": cpu_percent, "mem": float(mem), "net_rx": rx_rate, "net_tx": tx_rate}, counters
+
+
+def _series(points):
+    series = {"t": [int(ts) for ts, _ in points]}
+    for f in FIELDS:
+        series[f] = [round(values[f], 2) for _, values in points]
+    return series
+
+
+class MetricsCollector:
+    """Mantiene un stream de stats por contenedor en marcha y guarda las
+    muestras en buffers circulares con varios niveles de resolución.
+
+    Los contenedores a seguir salen del índice de cada motor (sus cambios
+    llegan por listener), así que no hay llamadas al daemon por petición.
+    """
+
+    def __init__(self, registry, max_streams=MAX_STREAMS):
+        self.registry = registry
+        self.max_streams = max_streams
+        self._lock = threading.Lock()
+        self._history = {}  # ref -> ContainerMetrics
+        self._streams = {}  # ref -> Event que detiene su hilo
+        self._clients = {}  # motor -> cliente propio con pool para los streams
+        self._overflow = False  # quedaron contenedores en marcha sin stream por max_streams
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.registry.add_listener(self._on_change)
+        for entry in self.registry.list():
+            self._on_change(entry)
+
+    def stop(self):
+        with self._lock:
+            self._started = False
+            streams, self._streams = self._streams, {}
+        for stopped in streams.values():
+            stopped.set()
+
+    def _on_change(self, entry):
+        ref = entry["name"]
+        if entry.get("deleted"):
+            self._unfollow(ref)
+            with self._lock:
+                self._history.pop(ref, None)
+        elif entry.get("status") == "running":
+            self._follow(ref)
+        else:
+            # La historia se conserva mientras el contenedor exista
+            self._unfollow(ref)
+
+    def _follow(self, ref):
+        with self._lock:
+            if not self._started or ref in self._streams:
+                return
+            if len(self._streams) >= self.max_streams:
+                self._overflow = True
+                return
+            stopped = self._streams[ref] = threading.Event()
+            self._history.setdefault(ref, ContainerMetrics())
+        threading.Thread(target=self._collect, args=(ref, stopped), name=f"j5d-stats-{ref}", daemon=True).start()
+
+    def _unfollow(self, ref):
+        with self._lock:
+            stopped = self._streams.pop(ref, None)
+            rescan = bool(stopped) and self._overflow
+            if rescan:
+                self._overflow = False
+        if stopped:
+            stopped.set()
+        if rescan:
+            # Se liberó un hueco: entran los que se quedaron fuera por el límite
+            for entry in self.registry.list():
+                if entry.get("status") == "running":
+                    self._follow(entry["name"])
+
+    def _client(self, engine):
+        # Cada stream retiene una conexión: no se comparten con el pool de las peticiones
+        with self._lock:
+            if engine.name not in self._clients:
+                self._clients[engine.name] = engine.make_client(pool_size=self.max_streams)
+            return self._clients[engine.name]
+
+    def _collect(self, ref, stopped):
+        try:
+            engine, name = self.registry.resolve(ref)
+        except KeyError:
+            return
+        while not stopped.is_set():
+            counters = None
+            try:
+                for raw in self._client(engine).api.stats(name, stream=True, decode=True):
+                    # Salir del bucle cierra la respuesta HTTP del stream
+                    if stopped.is_set():
+                        break
+                    values, counters = parse_stats(raw, counters)
+                    # Las lecturas recorren los mismos buffers bajo el lock
+                    with self._lock:
+                        history = self._history.get(ref)
+                        if history is not None:
+                            history.add(time.time(), values)
+            except Exception as e:
+                if not stopped.is_set():
+                    print(f"⚠️  Stream de stats de {ref} interrumpido: {e}")
+            if stopped.wait(RETRY_DELAY):
+                break
+
+    # --- Lectura ---
+    def container(self, ref, tier="1s", points=None):
+        """Serie del contenedor en el nivel pedido, o None si no hay historia"""
+        if tier not in self.tiers():
+            raise KeyError(f"Nivel desconocido: {tier} (usa {', '.join(self.tiers())})")
+        with self._lock:
+            history = self._history.get(ref)
+            if history is None:
+                return None
+            return {
+                "name": ref,
+                "tier": tier,
+                "interval": history.tiers[tier].interval,
+                "latest": history.latest,
+                "series": _series(history.tiers[tier].points(points)),
+            }
+
+    def project(self, members, tier="1s", points=None):
+        """Suma de las series de los miembros, alineadas por intervalo"""
+        if tier not in self.tiers():
+            raise KeyError(f"Nivel desconocido: {tier} (usa {', '.join(self.tiers())})")
+        buckets, latest = {}, {}
+        with self._lock:
+            for ref in members:
+                history = self._history.get(ref)
+                if history is None:
+                    continue
+                latest[ref] = history.latest
+                for ts, values in history.tiers[tier].points(points):
+                    total = buckets.setdefault(ts, dict.fromkeys(FIELDS, 0.0))
+                    for f in FIELDS:
+                        total[f] += values[f]
+        merged = sorted(buckets.items())
+        if points:
+            merged = merged[-points:]
+        return {
+            "tier": tier,
+            "interval": dict((name, interval) for name, interval, _ in TIERS)[tier],
+            "containers": latest,
+            "series": _series(merged),
+        }
+
+    def stream_count(self):
+        """Streams de stats abiertos con los daemons"""
+        with self._lock:
+            return len(self._streams)
+
+    def latest(self):
+        """Última muestra de cada contenedor con historia"""
+        with self._lock:
+            return {ref: h.latest for ref, h in self._history.items() if h.latest}
+
+    @staticmethod
+    def tiers():
+        return [name for name, _, _ in TIERS]
@@ -0,0 +1,250 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Contenedores que se arrancan/detienen a la vez dentro de un proyecto
+CONCURRENCY = int(os.environ.get("J5D_CONCURRENCY", "8"))
+# Segundos que Docker espera antes de matar un contenedor al detenerlo
+STOP_TIMEOUT = int(os.environ.get("J5D_STOP_TIMEOUT", "10"))
+# Segundos que cada oleada de un arranque ordenado espera a estar running/healthy
+START_TIMEOUT = float(os.environ.get("J5D_START_TIMEOUT", "60"))
+
+ACTIONS = ("start", "stop", "restart")
+
+
+def container_action(client, name, action, stop_timeout=STOP_TIMEOUT):
+    if action == "start":
+        client.api.start(name)
+    elif action == "stop":
+        client.api.stop(name, timeout=stop_timeout)
+    elif action == "restart":
+        client.api.restart(name, timeout=stop_timeout)
+    elif action == "pause":
+        client.api.pause(name)
+    elif action == "unpause":
+        client.api.unpause(name)
+    else:
+        raise ValueError(f"Acción desconocida: {action}")
+
+
+def run_project_action(registry, containers, action, concurrency=CONCURRENCY,
+                       stop_timeout=STOP_TIMEOUT, skip=(), on_result=None):
+    """Ejecuta la acción sobre todos los contenedores en paralelo.
+
+    Los contenedores ("motor:nombre" o "nombre") se agrupan por motor y cada
+    motor se atiende a la vez con su propio límite de concurrencia.
+    Devuelve un resultado por contenedor, en el orden del proyecto:
+    {"container", "ok", "error", "elapsed_ms"} (y "skipped" si ya estaba
+    en el estado pedido). on_result(result) se llama según van terminando.
+    """
+    def result(ref, start, error=None):
+        return {
+            "container": ref,
+            "ok": error is None,
+            "error": error,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def run(engine, ref, name):
+        start = time.perf_counter()
+        try:
+            container_action(engine.client, name, action, stop_timeout)
+        except Exception as e:
+            return result(ref, start, str(e))
+        return result(ref, start)
+
+    results = {}
+    groups = {}
+    lock = threading.Lock()
+
+    def report(r):
+        with lock:
+            results[r["container"]] = r
+            if on_result:
+                on_result(r)
+
+    for ref in containers:
+        if ref in skip:
+            report({"container": ref, "ok": True, "error": None, "elapsed_ms": 0.0, "skipped": True})
+            continue
+        try:
+            engine, name = registry.resolve(ref)
+        except KeyError as e:
+            report(result(ref, time.perf_counter(), str(e.args[0])))
+            continue
+        groups.setdefault(engine, []).append((ref, name))
+
+    def run_group(engine, members):
+        workers = max(1, min(concurrency, len(members)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"j5d-{engine.name}") as pool:
+            futures = [pool.submit(run, engine, ref, name) for ref, name in members]
+            for future in as_completed(futures):
+                report(future.result())
+
+    if len(groups) == 1:
+        run_group(*next(iter(groups.items())))
+    elif groups:
+        # Un hilo por motor: un motor lento no retrasa a los demás
+        with ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix="j5d-engines") as pool:
+            for future in [pool.submit(run_group, engine, members) for engine, members in groups.items()]:
+                future.result()
+
+    return [results[ref] for ref in containers]
+
+
+def plan_waves(containers, depends_on):
+    """Ordena los contenedores en oleadas: cada una solo depende de las
+    anteriores. Se ignoran dependencias que no son del proyecto; un ciclo
+    lanza ValueError."""
+    members = set(containers)
+    deps = {c: {d for d in depends_on.get(c, ()) if d in members and d != c} for c in containers}
+    waves, done, remaining = [], set(), list(containers)
+    while remaining:
+        wave = [c for c in remaining if deps[c] <= done]
+        if not wave:
+            raise ValueError(f"Dependencias circulares entre: {', '.join(remaining)}")
+        waves.append(wave)
+        done.update(wave)
+        remaining = [c for c in remaining if c not in done]
+    return waves
+
+
+def _health(client, name):
+    """(tiene healthcheck, estado de salud según el daemon o None)"""
+    info = client.api.inspect_container(name)
+    test = ((info.get("Config") or {}).get("Healthcheck") or {}).get("Test")
+    health = ((info.get("State") or {}).get("Health") or {}).get("Status")
+    return bool(test) and test != ["NONE"], health
+
+
+def wait_ready(registry, ref, timeout, skipped=False):
+    """Espera por eventos a que el contenedor esté en marcha y, si tiene
+    healthcheck, healthy. Devuelve None si lo está o el motivo si no.
+
+    skipped: ya estaba en marcha antes de la acción; solo se espera si su
+    healthcheck sigue en "starting"."""
+    engine, name = registry.resolve(ref)
+    healthcheck, inspected = _health(engine.client, name)
+    if skipped and inspected != "starting":
+        timeout = 0
+    seen_running = False
+
+    def check(entry):
+        nonlocal seen_running
+        if entry is None:
+            return None
+        if entry["status"] == "running":
+            seen_running = True
+            # Si el índice aún no sabe la salud (no llegó ningún health_status) vale la del inspect
+            health = entry.get("health") or inspected
+            if not healthcheck or health == "healthy":
+                return "ready"
+            if health == "unhealthy":
+                return "unhealthy"
+        elif seen_running and entry["status"] in ("exited", "dead"):
+            # Arrancó y se cayó: no hace falta esperar al timeout
+            return "exited"
+        return None
+
+    outcome = registry.wait_until(ref, check, timeout)
+    if outcome == "ready":
+        return None
+    if outcome == "unhealthy":
+        return "El healthcheck falló (unhealthy)"
+    if outcome == "exited":
+        return "El contenedor se detuvo al arrancar"
+    entry = registry.get(ref) or {}
+    state = entry.get("health") or entry.get("status", "desconocido")
+    return f"No estuvo listo a tiempo (estado: {state})"
+
+
+def run_ordered_action(registry, containers, action, depends_on=None, concurrency=CONCURRENCY,
+                       stop_timeout=STOP_TIMEOUT, start_timeout=START_TIMEOUT, skip=(),
+                       on_result=None, on_wave=None, resumed=()):
+    """Como run_project_action, pero respetando las dependencias del proyecto.
+
+    start arranca por oleadas (en paralelo dentro de cada una) y espera a que
+    cada oleada esté en marcha/healthy antes de la siguiente; stop va en orden
+    inverso. Si algo falla, lo que depende de ello no se arranca.
+    on_wave(action, contenedores) se llama al empezar cada oleada.
+    resumed: contenedores recién reanudados (van en skip) que no se esperan.
+    """
+    depends_on = depends_on or {}
+    if not any(depends_on.get(c) for c in containers):
+        return run_project_action(registry, containers, action, concurrency, stop_timeout, skip, on_result)
+    waves = plan_waves(containers, depends_on)
+    if action == "restart":
+        results = _run_waves(registry, waves[::-1], "stop", depends_on, concurrency, stop_timeout,
+                             start_timeout, (), None, on_wave)
+        results.update(_run_waves(registry, waves, "start", depends_on, concurrency, stop_timeout,
+                                  start_timeout, (), on_result, on_wave))
+    elif action == "stop":
+        results = _run_waves(registry, waves[::-1], action, depends_on, concurrency, stop_timeout,
+                             start_timeout, skip, on_result, on_wave)
+    else:
+        results = _run_waves(registry, waves, action, depends_on, concurrency, stop_timeout,
+                             start_timeout, skip, on_result, on_wave, resumed)
+    return [results[ref] for ref in containers]
+
+
+def _run_waves(registry, waves, action, depends_on, concurrency, stop_timeout, start_timeout,
+               skip, on_result, on_wave, resumed=()):
+    results, failed = {}, set()
+
+    def report(r):
+        results[r["container"]] = r
+        if not r["ok"]:
+            failed.add(r["container"])
+        if on_result:
+            on_result(r)
+
+    if action == "start":
+        # Los eventos de salud/estado llegan por el índice: se escuchan desde antes de arrancar
+        engines = set()
+        for ref in (ref for wave in waves for ref in wave):
+            try:
+                engines.add(registry.resolve(ref)[0])
+            except KeyError:
+                pass
+        for engine in engines:
+            try:
+                engine.index.start()
+            except Exception:
+                pass  # cada contenedor de ese motor fallará con su propio error
+
+    for wave in waves:
+        if on_wave:
+            on_wave(action, wave)
+        started = time.perf_counter()
+        runnable = []
+        for ref in wave:
+            blocked = [d for d in depends_on.get(ref, ()) if d in failed]
+            if action == "start" and blocked:
+                report({"container": ref, "ok": False, "error": f"Dependencia no disponible: {', '.join(blocked)}",
+                        "elapsed_ms": 0.0})
+            else:
+                runnable.append(ref)
+        if action != "start":
+            # Al detener, un fallo no bloquea nada: todo se intenta parar
+            for r in run_project_action(registry, runnable, action, concurrency, stop_timeout, skip):
+                report(r)
+            continue
+        wave_results = run_project_action(registry, runnable, action, concurrency, stop_timeout, skip)
+
+        def ready(r):
+            if not r["ok"] or r["container"] in resumed:
+                return r
+            try:
+                error = wait_ready(registry, r["container"], max(0.0, start_timeout - (time.perf_counter() - started)),
+                                   skipped=r.get("skipped", False))
+            except Exception as e:
+                error = str(e)
+            return {**r, "ok": error is None, "error": error,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+        # Todos los de la oleada esperan a la vez, con el mismo plazo
+        with ThreadPoolExecutor(max_workers=max(1, len(wave_results)), thread_name_prefix="j5d-ready") as pool:
+            for r in pool.map(ready, wave_results):
+                report(r)
+    return results
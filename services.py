@@ -0,0 +1,52 @@
+import threading
+
+from telemetry import telemetry
+
+DATA_FILE = "docker_data.json"
+DATA_DB = "docker_data.db"
+
+# Recursos compartidos que se crean la primera vez que se piden, para que los
+# comandos cortos de terminal no paguen lo que no usan (docker, Flask...)
+_lock = threading.RLock()
+_registry = None
+_store = None
+
+
+def get_registry():
+    global _registry
+    with _lock:
+        if _registry is None:
+            from engines import EngineRegistry
+            _registry = EngineRegistry()
+        return _registry
+
+
+def get_store():
+    global _store
+    with _lock:
+        if _store is None:
+            from store import Store
+            # Alias y proyectos en SQLite; el docker_data.json antiguo se importa una sola vez
+            _store = Store(DATA_DB, legacy_file=DATA_FILE)
+        return _store
+
+
+def _rows(data):
+    projects = data.get("projects", {}).values()
+    members = sum(len(p["containers"] if isinstance(p, dict) else p) for p in projects)
+    return len(data.get("aliases", {})) + members
+
+
+def load_data():
+    store = get_store()
+    with telemetry.timer("j5d_store_seconds", op="load"):
+        data = store.snapshot()
+    telemetry.inc("j5d_store_rows_total", _rows(data), op="load")
+    return data
+
+
+def save_data(data):
+    store = get_store()
+    with telemetry.timer("j5d_store_seconds", op="save"):
+        store.replace_all(data)
+    telemetry.inc("j5d_store_rows_total", _rows(data), op="save")
@@ -0,0 +1,312 @@
+const { createApp, ref, onMounted, watch } = Vue;
+
+createApp({
+    setup() {
+        const containers = ref([]);
+        const projects = ref({});
+        const aliases = ref({});
+        const engines = ref({});
+        // Lista de contenedores paginada en el servidor
+        const filters = ref({ q: '', status: '', project: '', sort: 'name' });
+        const statuses = ['running', 'paused', 'restarting', 'created', 'exited', 'dead'];
+        const total = ref(null);
+        const nextCursor = ref(null);
+        const loading = ref(false);
+        const sentinel = ref(null);
+        const PAGE_SIZE = 100;
+        const inputs = ref({});
+        const notification = ref(null);
+        // Métricas: última muestra por contenedor y series por proyecto
+        const metrics = ref({});
+        const projectMetrics = ref({});
+        const METRICS_POINTS = 60;
+        // Suspensión de proyectos (pause/unpause) y latencia de la última reanudación
+        const projectStates = ref({});
+        // Uso de disco por proyecto (caché del servidor; se recarga con el evento SSE "disk")
+        const projectDisk = ref({});
+        let streaming = false;
+
+        const showNotification = (msg) => {
+            notification.value = msg;
+            setTimeout(() => { notification.value = null; }, 3000);
+        };
+
+        // Cursor de /api/data: con él solo se piden los cambios (o un 304)
+        let version = null;
+
+        const loadContainers = async (reset = true) => {
+            if (!reset && (!nextCursor.value || loading.value)) return;
+            const params = new URLSearchParams({ sort: filters.value.sort, limit: PAGE_SIZE });
+            if (filters.value.q) params.set('q', filters.value.q);
+            if (filters.value.status) params.set('status', filters.value.status);
+            if (filters.value.project) params.set('project', filters.value.project);
+            if (!reset) params.set('cursor', nextCursor.value);
+            loading.value = true;
+            try {
+                const res = await fetch(`/api/containers?${params}`);
+                const json = await res.json();
+                if (reset) {
+                    containers.value = json.containers;
+                    total.value = json.total;
+                } else {
+                    containers.value.push(...json.containers);
+                }
+                nextCursor.value = json.next;
+            } catch (e) {
+                console.error("Error cargando contenedores", e);
+            } finally {
+                loading.value = false;
+            }
+        };
+
+        // Versión en cliente de los filtros, para los cambios que llegan por SSE
+        const matchesFilters = (c) => {
+            const f = filters.value;
+            return (!f.q || c.name.toLowerCase().includes(f.q.toLowerCase()))
+                && (!f.status || c.status === f.status)
+                && (!f.project || (projects.value[f.project] || []).includes(c.name));
+        };
+
+        // full: pide todo aunque haya versión (los deltas no traen contenedores)
+        const fetchData = async (full = false) => {
+            try {
+                const res = version && !full
+                    ? await fetch(`/api/data?containers=0&since=${version}`, { headers: { 'If-None-Match': `"${version}"` } })
+                    : await fetch('/api/data?containers=0');
+                if (res.status === 304) return;
+                const json = await res.json();
+                engines.value = json.engines || {};
+                if (json.delta) {
+                    Object.entries(json.data.aliases).forEach(([alias, container]) => applyAlias({ alias, container }));
+                    json.deleted.aliases.forEach(alias => applyAlias({ alias, deleted: true }));
+                    Object.entries(json.data.projects).forEach(([project, conts]) => applyProject({ project, containers: conts }));
+                    json.deleted.projects.forEach(project => applyProject({ project, deleted: true }));
+                } else {
+                    projects.value = json.data.projects;
+                    aliases.value = json.data.aliases;
+                    loadContainers(true);
+                    fetch('/api/project/states').then(r => r.json()).then(states => { projectStates.value = states; });
+                    fetchDisk();
+                }
+                version = json.version;
+            } catch (e) {
+                console.error("Error cargando datos", e);
+            }
+        };
+
+        // Aplica los deltas que llegan por SSE sobre el estado reactivo
+        const applyContainer = (c) => {
+            const i = containers.value.findIndex(x => x.name === c.name);
+            if (c.deleted || (i !== -1 && !matchesFilters(c))) {
+                if (i !== -1) containers.value.splice(i, 1);
+            } else if (i === -1) {
+                // Solo se añade si ya está cargada la última página
+                if (!nextCursor.value && matchesFilters(c)) containers.value.push(c);
+            } else {
+                containers.value[i] = c;
+            }
+        };
+
+        const applyAlias = (a) => {
+            if (a.deleted) delete aliases.value[a.alias];
+            else aliases.value[a.alias] = a.container;
+        };
+
+        const applyProject = (p) => {
+            if (p.deleted) delete projects.value[p.project];
+            else projects.value[p.project] = p.containers;
+        };
+
+        const connectStream = () => {
+            const source = new EventSource('/api/stream');
+            // Al (re)conectar se hace un único fetch completo; después solo deltas
+            source.onopen = () => { streaming = true; fetchData(true); };
+            source.onerror = () => { streaming = false; };
+            source.addEventListener('container', (e) => applyContainer(JSON.parse(e.data)));
+            source.addEventListener('alias', (e) => applyAlias(JSON.parse(e.data)));
+            source.addEventListener('project', (e) => applyProject(JSON.parse(e.data)));
+            source.addEventListener('job', (e) => applyJob(JSON.parse(e.data)));
+            source.addEventListener('disk', () => fetchDisk());
+            source.addEventListener('project_state', (e) => {
+                const st = JSON.parse(e.data);
+                projectStates.value[st.project] = st;
+            });
+        };
+
+        const fetchMetrics = async () => {
+            if (document.hidden) return;
+            try {
+                const res = await fetch('/api/metrics');
+                if (!res.ok) return; // métricas desactivadas en el servidor
+                metrics.value = (await res.json()).containers;
+                const series = {};
+                await Promise.all(Object.keys(projects.value).map(async (p) => {
+                    const r = await fetch(`/api/project/metrics/${encodeURIComponent(p)}?points=${METRICS_POINTS}`);
+                    if (r.ok) series[p] = (await r.json()).series;
+                }));
+                projectMetrics.value = series;
+            } catch (e) {
+                console.error("Error cargando métricas", e);
+            }
+        };
+
+        const fetchDisk = async () => {
+            try {
+                const res = await fetch('/api/project/disk');
+                if (res.ok) projectDisk.value = await res.json();
+            } catch (e) {
+                console.error("Error cargando uso de disco", e);
+            }
+        };
+
+        // Puntos de un <polyline> de 120x24 para una serie
+        const sparkline = (values) => {
+            if (!values || values.length < 2) return '';
+            const max = Math.max(...values) || 1;
+            const step = 120 / (values.length - 1);
+            return values.map((v, i) => `${(i * step).toFixed(1)},${(24 - v / max * 22 - 1).toFixed(1)}`).join(' ');
+        };
+
+        const formatBytes = (b) => {
+            if (b == null) return '-';
+            const units = ['B', 'KB', 'MB', 'GB'];
+            let i = 0;
+            while (b >= 1024 && i < units.length - 1) { b /= 1024; i++; }
+            return `${b.toFixed(i ? 1 : 0)} ${units[i]}`;
+        };
+
+        const last = (values) => values && values.length ? values[values.length - 1] : null;
+
+        // Visor de logs en vivo (SSE); se guardan como mucho LOG_LINES líneas
+        const logView = ref(null);
+        const LOG_LINES = 2000;
+        let logSource = null;
+
+        const closeLogs = () => {
+            if (logSource) logSource.close();
+            logSource = null;
+            logView.value = null;
+        };
+
+        const openLogs = (title, url, prefixed) => {
+            closeLogs();
+            logView.value = { title, prefixed, lines: [] };
+            logSource = new EventSource(url);
+            logSource.addEventListener('log', (e) => {
+                const lines = logView.value.lines;
+                lines.push(JSON.parse(e.data));
+                if (lines.length > LOG_LINES) lines.splice(0, lines.length - LOG_LINES);
+            });
+        };
+
+        const apiCall = async (endpoint, method='POST', body=null) => {
+            const options = { method };
+            if (body) {
+                options.headers = { 'Content-Type': 'application/json' };
+                options.body = JSON.stringify(body);
+            }
+
+            try {
+                const res = await fetch(endpoint, options);
+                const json = await res.json().catch(() => ({}));
+                if (!res.ok || json.success === false) {
+                    const failed = (json.results || []).filter(r => !r.ok).map(r => `${r.container}: ${r.error}`);
+                    alert(["❌ " + (json.error || "La acción falló"), ...failed].join("\n"));
+                    return;
+                }
+                showNotification(json.resume_ms != null ? `⚡ Reanudado en ${Math.round(json.resume_ms)} ms` : "✅ Acción ejecutada con éxito");
+                // Con el stream conectado los cambios llegan solos
+                if (!streaming) fetchData(true);
+            } catch (e) {
+                alert("Error en la solicitud.");
+            }
+        };
+
+        // Selección múltiple y progreso del último lote (llega por el evento SSE "job")
+        const selected = ref(new Set());
+        const job = ref(null);
+
+        const toggleSelected = (name) => {
+            if (selected.value.has(name)) selected.value.delete(name);
+            else selected.value.add(name);
+        };
+
+        const toggleAll = (checked) => {
+            containers.value.forEach(c => checked ? selected.value.add(c.name) : selected.value.delete(c.name));
+        };
+
+        const applyJob = (j) => {
+            if (!job.value || job.value.id !== j.id) return;
+            job.value = { ...job.value, ...j };
+            if (j.status === 'done') {
+                showNotification(j.success ? `✅ Lote completado (${j.total})` : `❌ Lote con ${j.counts.error} errores`);
+                if (!streaming) fetchData(true);
+            }
+        };
+
+        const runBatch = async (action) => {
+            const operations = [...selected.value].map(name => ({ kind: 'container', name, action }));
+            try {
+                const res = await fetch('/api/batch', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ operations }),
+                });
+                const json = await res.json();
+                if (!res.ok) { alert("❌ " + json.error); return; }
+                job.value = { id: json.job, total: json.total, status: 'pending', counts: {} };
+                selected.value.clear();
+                // Sin stream no llegan los eventos: se consulta el job hasta que termine
+                if (!streaming) pollJob(json.job);
+            } catch (e) {
+                alert("Error en la solicitud.");
+            }
+        };
+
+        const pollJob = async (id) => {
+            const res = await fetch(`/api/jobs/${id}`);
+            if (!res.ok) return;
+            const j = await res.json();
+            applyJob(j);
+            if (j.status !== 'done') setTimeout(() => pollJob(id), 1000);
+        };
+
+        const addToProject = (containerName) => {
+            const pName = inputs.value[containerName + '_project'];
+            if (!pName) return;
+            apiCall('/api/project/add', 'POST', { project: pName.trim(), container: containerName });
+            inputs.value[containerName + '_project'] = ''; // Limpiar input
+        };
+
+        const addAlias = (containerName) => {
+            const aName = inputs.value[containerName + '_alias'];
+            if (!aName) return;
+            apiCall('/api/alias/add', 'POST', { alias: aName.trim(), container: containerName });
+            inputs.value[containerName + '_alias'] = ''; // Limpiar input
+        };
+
+        let filterTimer = null;
+        watch(filters, () => {
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(() => loadContainers(true), 250);
+        }, { deep: true });
+
+        onMounted(() => {
+            fetchData();
+            connectStream();
+            new IntersectionObserver((entries) => {
+                if (entries.some(e => e.isIntersecting)) loadContainers(false);
+            }, { rootMargin: '400px' }).observe(sentinel.value);
+            fetchMetrics();
+            setInterval(fetchMetrics, 5000);
+        });
+
+        return { 
+            containers, projects, aliases, engines, inputs, notification, projectStates,
+            filters, statuses, total, nextCursor, loading, sentinel,
+            metrics, projectMetrics, projectDisk, sparkline, formatBytes, last, logView, openLogs, closeLogs,
+            selected, job, toggleSelected, toggleAll, runBatch,
+            fetchData, apiCall, addToProject, addAlias 
+        };
+    }
+}).mount('#app');
@@ -0,0 +1,455 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from telemetry import telemetry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    container TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    start_timeout REAL,
+    stop_timeout INTEGER,
+    suspended_at REAL,
+    resume_ms REAL
+);
+CREATE TABLE IF NOT EXISTS suspended_members (
+    project TEXT NOT NULL REFERENCES projects(name) ON DELETE CASCADE,
+    container TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (project, container)
+);
+CREATE TABLE IF NOT EXISTS project_members (
+    project TEXT NOT NULL REFERENCES projects(name) ON DELETE CASCADE,
+    container TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (project, container)
+);
+CREATE TABLE IF NOT EXISTS project_dependencies (
+    project TEXT NOT NULL REFERENCES projects(name) ON DELETE CASCADE,
+    container TEXT NOT NULL,
+    depends_on TEXT NOT NULL,
+    PRIMARY KEY (project, container, depends_on)
+);
+CREATE TABLE IF NOT EXISTS idle_policies (
+    project TEXT PRIMARY KEY REFERENCES projects(name) ON DELETE CASCADE,
+    action TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    idle_minutes REAL,
+    cpu_below REAL,
+    net_below REAL,
+    ttl_minutes REAL,
+    dry_run INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS idle_actions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    at REAL NOT NULL,
+    project TEXT NOT NULL,
+    containers TEXT NOT NULL,
+    action TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    dry_run INTEGER NOT NULL,
+    ok INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS tombstones (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS aliases_version ON aliases(version);
+CREATE INDEX IF NOT EXISTS projects_version ON projects(version);
+CREATE INDEX IF NOT EXISTS tombstones_version ON tombstones(version);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+INSERT OR IGNORE INTO meta (key, value) VALUES ('floor', '0');
+"""
+
+# Columnas añadidas después de la primera versión del esquema
+MIGRATIONS = [
+    ("aliases", "version", "ALTER TABLE aliases ADD COLUMN version INTEGER NOT NULL DEFAULT 0"),
+    ("projects", "version", "ALTER TABLE projects ADD COLUMN version INTEGER NOT NULL DEFAULT 0"),
+    ("projects", "start_timeout", "ALTER TABLE projects ADD COLUMN start_timeout REAL"),
+    ("projects", "stop_timeout", "ALTER TABLE projects ADD COLUMN stop_timeout INTEGER"),
+    ("projects", "suspended_at", "ALTER TABLE projects ADD COLUMN suspended_at REAL"),
+    ("projects", "resume_ms", "ALTER TABLE projects ADD COLUMN resume_ms REAL"),
+]
+
+# Acciones del apagado automático que se conservan
+MAX_IDLE_ACTIONS = 1000
+IDLE_POLICY_FIELDS = ("action", "scope", "idle_minutes", "cpu_below", "net_below", "ttl_minutes", "dry_run")
+
+# Valor por defecto de los parámetros opcionales: "no cambiar"
+_UNSET = object()
+
+
+class Store:
+    """Alias y proyectos en SQLite (modo WAL).
+
+    Cada hilo usa su propia conexión y cada cambio es una transacción, así que
+    el servidor web y los comandos de terminal pueden escribir a la vez sin
+    perder datos. La primera vez se importa el antiguo docker_data.json.
+
+    Cada transacción que modifica algo sube la versión global (tabla meta) y
+    marca las filas tocadas con ella, para poder servir deltas con ?since=.
+    """
+
+    def __init__(self, path, legacy_file=None):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        for table, column, ddl in MIGRATIONS:
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+            if exists and column not in [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]:
+                conn.execute(ddl)
+        conn.executescript(SCHEMA)
+        if legacy_file:
+            self._import_legacy(legacy_file)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, immediate=True):
+        return _Transaction(self._conn(), immediate)
+
+    @staticmethod
+    def _bump(conn):
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+        return int(conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+
+    @staticmethod
+    def _touch(conn, kind, key, version, deleted=False):
+        if deleted:
+            conn.execute(
+                "INSERT OR REPLACE INTO tombstones (kind, key, version) VALUES (?, ?, ?)", (kind, key, version)
+            )
+        else:
+            conn.execute("DELETE FROM tombstones WHERE kind = ? AND key = ?", (kind, key))
+
+    def version(self):
+        return int(self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+
+    def _import_legacy(self, legacy_file):
+        if not os.path.exists(legacy_file):
+            return
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'legacy_imported'").fetchone()
+            if row:
+                return
+            with open(legacy_file, "r") as f:
+                data = json.load(f)
+            self._replace(conn, data)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)", (legacy_file,))
+        print(f"📦 Datos importados desde {legacy_file} a {self.path}")
+
+    # --- Alias ---
+    def get_alias(self, alias):
+        row = self._conn().execute("SELECT container FROM aliases WHERE alias = ?", (alias,)).fetchone()
+        return row[0] if row else None
+
+    def set_alias(self, alias, container):
+        with self._transaction() as conn:
+            version = self._bump(conn)
+            conn.execute(
+                "INSERT INTO aliases (alias, container, version) VALUES (?, ?, ?) "
+                "ON CONFLICT(alias) DO UPDATE SET container = excluded.container, version = excluded.version",
+                (alias, container, version),
+            )
+            self._touch(conn, "alias", alias, version)
+
+    def delete_alias(self, alias):
+        with self._transaction() as conn:
+            if not conn.execute("DELETE FROM aliases WHERE alias = ?", (alias,)).rowcount:
+                return False
+            self._touch(conn, "alias", alias, self._bump(conn), deleted=True)
+            return True
+
+    def aliases(self):
+        return dict(self._conn().execute("SELECT alias, container FROM aliases ORDER BY rowid"))
+
+    # --- Proyectos ---
+    def get_project(self, project):
+        """Contenedores del proyecto en orden, o None si no existe"""
+        conn = self._conn()
+        if not conn.execute("SELECT 1 FROM projects WHERE name = ?", (project,)).fetchone():
+            return None
+        rows = conn.execute(
+            "SELECT container FROM project_members WHERE project = ? ORDER BY position", (project,)
+        )
+        return [r[0] for r in rows]
+
+    def add_to_project(self, project, container):
+        """Añade el contenedor al final del proyecto (creándolo si hace falta)"""
+        with self._transaction() as conn:
+            version = self._bump(conn)
+            conn.execute(
+                "INSERT INTO projects (name, version) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET version = excluded.version",
+                (project, version),
+            )
+            self._touch(conn, "project", project, version)
+            conn.execute(
+                "INSERT OR IGNORE INTO project_members (project, container, position) "
+                "SELECT ?, ?, COALESCE(MAX(position), -1) + 1 FROM project_members WHERE project = ?",
+                (project, container, project),
+            )
+            return self.get_project(project)
+
+    def delete_project(self, project):
+        with self._transaction() as conn:
+            if not conn.execute("DELETE FROM projects WHERE name = ?", (project,)).rowcount:
+                return False
+            self._touch(conn, "project", project, self._bump(conn), deleted=True)
+            return True
+
+    def project_config(self, project):
+        """{"depends_on": {contenedor: [dependencias]}, "start_timeout",
+        "stop_timeout"} del proyecto (timeouts None = por defecto), o None si no existe"""
+        conn = self._conn()
+        row = conn.execute("SELECT start_timeout, stop_timeout FROM projects WHERE name = ?", (project,)).fetchone()
+        if row is None:
+            return None
+        depends_on = {}
+        rows = conn.execute(
+            "SELECT container, depends_on FROM project_dependencies WHERE project = ? ORDER BY rowid", (project,)
+        )
+        for container, dependency in rows:
+            depends_on.setdefault(container, []).append(dependency)
+        return {"depends_on": depends_on, "start_timeout": row[0], "stop_timeout": row[1]}
+
+    def set_project_config(self, project, depends_on=_UNSET, start_timeout=_UNSET, stop_timeout=_UNSET):
+        """Cambia solo lo indicado; depends_on sustituye todas las dependencias.
+        Devuelve la configuración resultante, o None si el proyecto no existe"""
+        with self._transaction() as conn:
+            if not conn.execute("SELECT 1 FROM projects WHERE name = ?", (project,)).fetchone():
+                return None
+            version = self._bump(conn)
+            conn.execute("UPDATE projects SET version = ? WHERE name = ?", (version, project))
+            if start_timeout is not _UNSET:
+                conn.execute("UPDATE projects SET start_timeout = ? WHERE name = ?", (start_timeout, project))
+            if stop_timeout is not _UNSET:
+                conn.execute("UPDATE projects SET stop_timeout = ? WHERE name = ?", (stop_timeout, project))
+            if depends_on is not _UNSET:
+                self._set_dependencies(conn, project, depends_on)
+            return self.project_config(project)
+
+    @staticmethod
+    def _set_dependencies(conn, project, depends_on):
+        conn.execute("DELETE FROM project_dependencies WHERE project = ?", (project,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO project_dependencies (project, container, depends_on) VALUES (?, ?, ?)",
+            [(project, c, d) for c, deps in (depends_on or {}).items() for d in deps],
+        )
+
+    # --- Suspensión (pause/unpause) ---
+    def project_state(self, project):
+        """{"suspended", "suspended_at", "containers" (los que se pausaron),
+        "resume_ms" (lo que tardó la última reanudación)}, o None si no existe"""
+        return self.project_states(project).get(project)
+
+    def project_states(self, project=None):
+        conn = self._conn()
+        where, params = ("WHERE name = ?", (project,)) if project is not None else ("", ())
+        states = {
+            name: {"suspended": suspended_at is not None, "suspended_at": suspended_at, "containers": [], "resume_ms": resume_ms}
+            for name, suspended_at, resume_ms in conn.execute(
+                f"SELECT name, suspended_at, resume_ms FROM projects {where} ORDER BY rowid", params
+            )
+        }
+        rows = conn.execute(
+            f"SELECT project, container FROM suspended_members {where.replace('name', 'project')} ORDER BY project, position",
+            params,
+        )
+        for name, container in rows:
+            states[name]["containers"].append(container)
+        return states
+
+    def set_suspended(self, project, containers):
+        """Marca el proyecto como suspendido y recuerda qué contenedores se pausaron"""
+        with self._transaction() as conn:
+            conn.execute("UPDATE projects SET suspended_at = ? WHERE name = ?", (time.time(), project))
+            conn.execute("DELETE FROM suspended_members WHERE project = ?", (project,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO suspended_members (project, container, position) VALUES (?, ?, ?)",
+                [(project, c, i) for i, c in enumerate(containers)],
+            )
+            return self.project_state(project)
+
+    def clear_suspended(self, project, resume_ms=None):
+        """Quita la marca de suspendido; resume_ms se guarda si se reanudó"""
+        with self._transaction() as conn:
+            conn.execute("UPDATE projects SET suspended_at = NULL WHERE name = ?", (project,))
+            if resume_ms is not None:
+                conn.execute("UPDATE projects SET resume_ms = ? WHERE name = ?", (resume_ms, project))
+            conn.execute("DELETE FROM suspended_members WHERE project = ?", (project,))
+            return self.project_state(project)
+
+    # --- Apagado automático ---
+    def idle_policies(self):
+        """proyecto -> política de inactividad"""
+        rows = self._conn().execute(f"SELECT project, {', '.join(IDLE_POLICY_FIELDS)} FROM idle_policies")
+        return {row[0]: {**dict(zip(IDLE_POLICY_FIELDS, row[1:])), "dry_run": bool(row[-1])} for row in rows}
+
+    def idle_policy(self, project):
+        return self.idle_policies().get(project)
+
+    def set_idle_policy(self, project, policy):
+        """Crea o sustituye la política; False si el proyecto no existe"""
+        with self._transaction() as conn:
+            if not conn.execute("SELECT 1 FROM projects WHERE name = ?", (project,)).fetchone():
+                return False
+            conn.execute(
+                f"INSERT OR REPLACE INTO idle_policies (project, {', '.join(IDLE_POLICY_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' for _ in IDLE_POLICY_FIELDS)})",
+                (project, *(int(policy[f]) if f == "dry_run" else policy.get(f) for f in IDLE_POLICY_FIELDS)),
+            )
+            return True
+
+    def delete_idle_policy(self, project):
+        with self._transaction() as conn:
+            return bool(conn.execute("DELETE FROM idle_policies WHERE project = ?", (project,)).rowcount)
+
+    def log_idle_action(self, project, containers, action, reason, dry_run, ok=True, error=None):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO idle_actions (at, project, containers, action, reason, dry_run, ok, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), project, json.dumps(containers), action, reason, int(dry_run), int(ok), error),
+            )
+            conn.execute(
+                "DELETE FROM idle_actions WHERE id <= (SELECT MAX(id) FROM idle_actions) - ?", (MAX_IDLE_ACTIONS,)
+            )
+
+    def idle_actions(self, limit=100, project=None):
+        """Últimas acciones del apagado automático, de la más reciente a la más antigua"""
+        where, params = ("WHERE project = ?", (project,)) if project else ("", ())
+        rows = self._conn().execute(
+            "SELECT at, project, containers, action, reason, dry_run, ok, error FROM idle_actions "
+            f"{where} ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [
+            {"at": at, "project": p, "containers": json.loads(containers), "action": action, "reason": reason,
+             "dry_run": bool(dry_run), "ok": bool(ok), "error": error}
+            for at, p, containers, action, reason, dry_run, ok, error in rows
+        ]
+
+    def projects(self):
+        projects = {name: [] for (name,) in self._conn().execute("SELECT name FROM projects ORDER BY rowid")}
+        rows = self._conn().execute("SELECT project, container FROM project_members ORDER BY project, position")
+        for project, container in rows:
+            projects[project].append(container)
+        return projects
+
+    # --- Compatibilidad con el formato de docker_data.json ---
+    def snapshot(self):
+        # Lectura consistente de alias y proyectos, sin bloquear escritores
+        with self._transaction(immediate=False):
+            return {"aliases": self.aliases(), "projects": self.projects()}
+
+    def changes_since(self, version):
+        """Alias y proyectos cambiados/borrados desde la versión dada, o None si
+        es anterior a un reemplazo completo y hace falta la carga entera"""
+        with self._transaction(immediate=False) as conn:
+            floor = int(conn.execute("SELECT value FROM meta WHERE key = 'floor'").fetchone()[0])
+            if version < floor or version > self.version():
+                return None
+            aliases = dict(conn.execute(
+                "SELECT alias, container FROM aliases WHERE version > ? ORDER BY rowid", (version,)
+            ))
+            projects = {}
+            for (name,) in conn.execute("SELECT name FROM projects WHERE version > ?", (version,)).fetchall():
+                projects[name] = self.get_project(name)
+            deleted = {"aliases": [], "projects": []}
+            for kind, key in conn.execute("SELECT kind, key FROM tombstones WHERE version > ?", (version,)):
+                deleted["aliases" if kind == "alias" else "projects"].append(key)
+            return {"aliases": aliases, "projects": projects}, deleted
+
+    def replace_all(self, data):
+        with self._transaction() as conn:
+            self._replace(conn, data)
+
+    @classmethod
+    def _replace(cls, conn, data):
+        # Un reemplazo completo invalida los deltas anteriores
+        version = cls._bump(conn)
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'floor'", (str(version),))
+        conn.execute("DELETE FROM tombstones")
+        conn.execute("DELETE FROM aliases")
+        conn.execute("DELETE FROM project_members")
+        conn.executemany(
+            "INSERT INTO aliases (alias, container, version) VALUES (?, ?, ?)",
+            [(alias, container, version) for alias, container in data.get("aliases", {}).items()],
+        )
+        projects = data.get("projects", {})
+        # Solo se borran los proyectos que ya no están: los demás conservan lo que
+        # el formato de lista no trae (dependencias, timeouts, suspensión, política
+        # de inactividad), así que load_data() -> save_data() no pierde nada
+        existing = {name for (name,) in conn.execute("SELECT name FROM projects")}
+        conn.executemany("DELETE FROM projects WHERE name = ?", [(name,) for name in existing - set(projects)])
+        for project, containers in projects.items():
+            # Un proyecto es una lista de contenedores o, con dependencias,
+            # {"containers": [...], "depends_on": {...}, "start_timeout": s, "stop_timeout": s}
+            config = containers if isinstance(containers, dict) else {"containers": containers}
+            if project in existing:
+                conn.execute("UPDATE projects SET version = ? WHERE name = ?", (version, project))
+            else:
+                conn.execute("INSERT INTO projects (name, version) VALUES (?, ?)", (project, version))
+            if isinstance(containers, dict):
+                conn.execute(
+                    "UPDATE projects SET start_timeout = ?, stop_timeout = ? WHERE name = ?",
+                    (config.get("start_timeout"), config.get("stop_timeout"), project),
+                )
+                cls._set_dependencies(conn, project, config.get("depends_on"))
+            conn.executemany(
+                "INSERT OR IGNORE INTO project_members (project, container, position) VALUES (?, ?, ?)",
+                [(project, c, i) for i, c in enumerate(config.get("containers", []))],
+            )
+            # Las dependencias de contenedores que ya no son del proyecto sobran
+            conn.execute(
+                "DELETE FROM project_dependencies WHERE project = ? AND ("
+                "container NOT IN (SELECT container FROM project_members WHERE project = ?) OR "
+                "depends_on NOT IN (SELECT container FROM project_members WHERE project = ?))",
+                (project, project, project),
+            )
+
+
+class _Transaction:
+    """BEGIN [IMMEDIATE] ... COMMIT/ROLLBACK; anidable dentro del mismo hilo"""
+
+    def __init__(self, conn, immediate=True):
+        self.conn = conn
+        self.immediate = immediate
+        self.outer = False
+
+    def __enter__(self):
+        if not self.conn.in_transaction:
+            self.start = time.perf_counter()
+            self.conn.execute("BEGIN IMMEDIATE" if self.immediate else "BEGIN")
+            self.outer = True
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.outer:
+            self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+            telemetry.observe("j5d_store_transaction_seconds", time.perf_counter() - self.start,
+                              mode="write" if self.immediate else "read")
+        return False
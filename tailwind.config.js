@@ -0,0 +1,7 @@
+/** @type {import('tailwindcss').Config} */
+module.exports = {
+    // Solo se generan las clases que aparecen en la SPA
+    content: ["./static/src/**/*.{html,js}"],
+    theme: { extend: {} },
+    plugins: [],
+};
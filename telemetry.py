@@ -0,0 +1,325 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from urllib.parse import urlparse
+
+# Límites de los histogramas de tiempos (segundos), como los de Prometheus
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Perfiles de peticiones que se guardan y funciones de cada uno
+MAX_PROFILES = 50
+PROFILE_TOP = 25
+
+# Tipo y ayuda de cada métrica (líneas # TYPE / # HELP de /metrics)
+METRICS = {
+    "j5d_http_request_seconds": ("histogram", "Tiempo de respuesta por ruta"),
+    "j5d_http_requests_total": ("counter", "Peticiones por ruta y código de estado"),
+    "j5d_docker_request_seconds": ("histogram", "Latencia de las llamadas a la API de Docker por operación"),
+    "j5d_docker_errors_total": ("counter", "Llamadas a la API de Docker fallidas (excepción o estado >= 400)"),
+    "j5d_store_seconds": ("histogram", "Tiempo de load_data/save_data"),
+    "j5d_store_rows_total": ("counter", "Alias y miembros de proyecto leídos/escritos por load_data/save_data"),
+    "j5d_store_transaction_seconds": ("histogram", "Duración de las transacciones SQLite"),
+    "j5d_index_refresh_seconds": ("histogram", "Listados completos del índice de contenedores"),
+    "j5d_index_events_total": ("counter", "Eventos de Docker aplicados al índice"),
+    "j5d_cache_requests_total": ("counter", "Consultas a las cachés por resultado (hit, miss...)"),
+    "j5d_profiled_requests_total": ("counter", "Peticiones perfiladas con cProfile"),
+}
+
+
+class Histogram:
+    """Cuenta por intervalo (no acumulada) + suma; se acumula al exportar"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # el último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Aproximación por interpolación dentro del intervalo, como histogram_quantile()"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    def __init__(self, telemetry, name, labels):
+        self.telemetry = telemetry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.telemetry.observe(self.name, self.elapsed, **self.labels)
+        return False
+
+
+class Telemetry:
+    """Contadores e histogramas en memoria del proceso, con etiquetas.
+
+    Pensado para caminos calientes: cada observación es un lock, un bisect y
+    unas sumas. render() los exporta en el formato de texto de Prometheus y
+    summary() los resume para "j5d-stats".
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters = {}    # (nombre, etiquetas) -> valor
+        self._histograms = {}  # (nombre, etiquetas) -> Histogram
+        self._gauges = {}      # nombre -> (ayuda, función que devuelve {etiquetas: valor})
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def timer(self, name, **labels):
+        """with telemetry.timer("j5d_store_seconds", op="load"): ..."""
+        return _Timer(self, name, labels)
+
+    def cache(self, name, result):
+        """Resultado de una consulta a una caché: "hit", "miss" u otro (p. ej. "delta")"""
+        self.inc("j5d_cache_requests_total", cache=name, result=result)
+
+    def gauge(self, name, help, collect):
+        """collect() -> {(("etiqueta", "valor"), ...): valor}; se llama al exportar"""
+        self._gauges[name] = (help, collect)
+
+    # --- Exportación ---
+    def _snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: (list(h.counts), h.sum, h.count) for k, h in self._histograms.items()}
+        return counters, histograms
+
+    def render(self):
+        """Formato de texto de Prometheus (text/plain; version=0.0.4)"""
+        counters, histograms = self._snapshot()
+        lines = []
+        by_name = {}
+        for (name, labels), value in counters.items():
+            by_name.setdefault(name, []).append(("counter", labels, value))
+        for (name, labels), value in histograms.items():
+            by_name.setdefault(name, []).append(("histogram", labels, value))
+        for name in sorted(by_name):
+            kind, help = METRICS.get(name, (by_name[name][0][0], ""))
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            for kind, labels, value in sorted(by_name[name], key=lambda item: item[1]):
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, n in zip(list(BUCKETS) + ["+Inf"], counts):
+                    cumulative += n
+                    le = bound if bound == "+Inf" else _number(float(bound))
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_number(float(total))}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        lines += ["# HELP j5d_uptime_seconds Segundos desde que arrancó el proceso", "# TYPE j5d_uptime_seconds gauge",
+                  f"j5d_uptime_seconds {_number(round(time.time() - self.started, 3))}"]
+        for name, (help, collect) in sorted(self._gauges.items()):
+            try:
+                values = collect()
+            except Exception as e:
+                print(f"⚠️  Error leyendo la métrica {name}: {e}")
+                continue
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+            for labels, value in sorted(values.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Resumen para la terminal: tiempos por métrica (ordenados por tiempo
+        total) y porcentaje de aciertos de cada caché"""
+        counters, histograms = self._snapshot()
+        timings = {}
+        for (name, labels), (counts, total, count) in histograms.items():
+            histogram = Histogram()
+            histogram.counts, histogram.sum, histogram.count = counts, total, count
+            timings.setdefault(name, []).append({
+                **dict(labels),
+                "count": count,
+                "total_ms": round(total * 1000, 1),
+                "mean_ms": round(total / count * 1000, 2) if count else None,
+                "p50_ms": round(histogram.quantile(0.5) * 1000, 2),
+                "p95_ms": round(histogram.quantile(0.95) * 1000, 2),
+            })
+        for rows in timings.values():
+            rows.sort(key=lambda r: -r["total_ms"])
+        caches, totals = {}, {}
+        for (name, labels), value in counters.items():
+            labels = dict(labels)
+            if name == "j5d_cache_requests_total":
+                cache = caches.setdefault(labels["cache"], {})
+                cache[labels["result"]] = cache.get(labels["result"], 0) + value
+            else:
+                totals.setdefault(name, []).append({**labels, "value": value})
+        for cache in caches.values():
+            cache["hit_ratio"] = round(cache.get("hit", 0) / sum(cache.values()), 3)
+        return {"uptime": round(time.time() - self.started, 1), "timings": timings, "caches": caches, "counters": totals}
+
+
+# --- Docker ---
+# Recursos de la Engine API cuyo segundo tramo es un id o nombre
+_DOCKER_RESOURCES = {"containers", "images", "volumes", "networks", "exec", "plugins"}
+_DOCKER_COLLECTIONS = {"json", "create", "prune", "load", "search", "get"}
+
+
+def docker_operation(method, url):
+    """"GET", "http+docker://localhost/v1.45/containers/abc/json" -> "GET /containers/{id}/json"
+    (sin ids, para que las etiquetas no crezcan con cada contenedor)"""
+    parts = [p for p in urlparse(url).path.split("/") if p]
+    if parts and parts[0].startswith("v1."):
+        parts = parts[1:]
+    if len(parts) > 1 and parts[0] in _DOCKER_RESOURCES and parts[1] not in _DOCKER_COLLECTIONS:
+        parts = [parts[0], "{id}"] + parts[-1:] if len(parts) > 2 else [parts[0], "{id}"]
+    return f"{method} /{'/'.join(parts)}"
+
+
+def instrument_docker(api, engine):
+    """Mide cada llamada de un APIClient de docker-py. Para los streams
+    (events, logs, stats) cuenta hasta que llegan las cabeceras."""
+    request = api.request
+
+    def timed_request(method, url, *args, **kwargs):
+        operation = docker_operation(method, url)
+        start = time.perf_counter()
+        try:
+            response = request(method, url, *args, **kwargs)
+        except Exception:
+            telemetry.inc("j5d_docker_errors_total", engine=engine, operation=operation)
+            raise
+        finally:
+            telemetry.observe("j5d_docker_request_seconds", time.perf_counter() - start,
+                              engine=engine, operation=operation)
+        if response.status_code >= 400:
+            telemetry.inc("j5d_docker_errors_total", engine=engine, operation=operation)
+        return response
+
+    api.request = timed_request
+    return api
+
+
+# --- Perfilado de peticiones ---
+class RequestProfiler:
+    """Perfilado con cProfile de peticiones enteras, activable en marcha.
+
+    Solo se perfila una petición a la vez (cProfile no admite varios
+    perfiladores activos en algunos Python); las que llegan mientras tanto se
+    atienden sin perfilar. Se guardan las últimas MAX_PROFILES.
+    """
+
+    def __init__(self, enabled=False, max_profiles=MAX_PROFILES):
+        self.enabled = enabled
+        self.prefix = None
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+        self._profiles = deque(maxlen=max_profiles)
+        self._next_id = 1
+
+    def configure(self, enabled, prefix=None):
+        """prefix limita el perfilado a las rutas que empiezan por él"""
+        self.enabled = bool(enabled)
+        self.prefix = prefix or None
+        return self.status()
+
+    def status(self):
+        with self._lock:
+            return {"enabled": self.enabled, "prefix": self.prefix, "profiles": len(self._profiles)}
+
+    def start(self, path):
+        """Empieza a perfilar la petición, o None si no toca o ya hay otra en curso"""
+        if not self.enabled or (self.prefix and not path.startswith(self.prefix)):
+            return None
+        if not self._active.acquire(blocking=False):
+            return None
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Otro perfilador (un depurador, coverage...) ya está activo
+            self._active.release()
+            return None
+        return profile
+
+    def discard(self, profile):
+        profile.disable()
+        self._active.release()
+
+    def finish(self, profile, **info):
+        """Guarda el perfil con la información de la petición y devuelve su id"""
+        profile.disable()
+        self._active.release()
+        import pstats
+        stats = pstats.Stats(profile)
+        stats.sort_stats("cumulative")
+        functions = []
+        for func in stats.fcn_list[:PROFILE_TOP]:
+            calls, _, own, cumulative, _ = stats.stats[func]
+            filename, line, name = func
+            where = f"{os.path.basename(filename)}:{line}({name})" if line else name
+            functions.append({"function": where, "calls": calls,
+                              "own_ms": round(own * 1000, 3), "cumulative_ms": round(cumulative * 1000, 3)})
+        with self._lock:
+            profile_id = self._next_id
+            self._next_id += 1
+            self._profiles.append({"id": profile_id, "time": time.time(), **info, "functions": functions})
+        telemetry.inc("j5d_profiled_requests_total")
+        return profile_id
+
+    def list(self, limit=None):
+        with self._lock:
+            profiles = list(self._profiles)[::-1]
+        return profiles[:limit] if limit else profiles
+
+
+telemetry = Telemetry()
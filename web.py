@@ -0,0 +1,623 @@
+import os
+import time
+
+from flask import Flask, Response, g, jsonify, request
+
+import assets
+import services
+from change_feed import ChangeFeed
+from cli import COMMANDS, project_command
+from container_query import DEFAULT_LIMIT, ContainerQuery, InvalidQuery
+from control import ControlServer
+from disk_usage import DEFAULT_TOP, DiskUsageIndex
+from engines import ENGINE_BUDGET
+from idle import IdleScheduler, validate_policy
+from jobs import JobManager
+from log_streams import LogHub, format_sse, format_text, parse_since, parse_tail
+from metrics import METRICS_ENABLED, MetricsCollector
+from project_ops import ACTIONS, container_action, plan_waves, run_project_action
+from services import load_data
+from telemetry import RequestProfiler, telemetry
+
+app = Flask(__name__)
+store = services.get_store()
+# Motores Docker; cada uno con su índice en memoria mantenido al día con sus eventos
+registry = services.get_registry()
+# Cambios que se empujan al dashboard por /api/stream (SSE)
+feed = ChangeFeed()
+registry.add_listener(lambda entry: feed.publish("container", entry))
+# Filtros, orden y paginación sobre el inventario en memoria
+container_query = ContainerQuery(registry)
+# Logs en vivo: un único stream del daemon por contenedor, compartido por los clientes
+log_hub = LogHub(registry)
+# CPU/memoria/red de los contenedores en marcha, recogidos en segundo plano
+metrics = MetricsCollector(registry)
+# Perfilado con cProfile de peticiones enteras (J5D_PROFILE=1 o POST /api/profiling)
+profiler = RequestProfiler(enabled=os.environ.get("J5D_PROFILE", "0") == "1")
+# Uso de disco (montajes, capa escribible, imágenes) con caché; df nunca bloquea una petición
+disk = DiskUsageIndex(registry, on_refresh=lambda engine, status: feed.publish("disk", {"engine": engine, **status}))
+
+
+def _get_container(ref):
+    """"motor:contenedor" o "contenedor" -> objeto Container de su motor"""
+    engine, name = registry.resolve(ref)
+    return engine.client.containers.get(name)
+
+
+# ==========================================
+# INSTRUMENTACIÓN (/metrics y perfilado)
+# ==========================================
+@app.before_request
+def _start_request():
+    g.started = time.perf_counter()
+    g.profile = profiler.start(request.path)
+
+@app.after_request
+def _record_request(response):
+    # La ruta (no la URL) como etiqueta, para no crear una serie por contenedor
+    route = request.url_rule.rule if request.url_rule else "<sin ruta>"
+    elapsed = time.perf_counter() - g.started
+    telemetry.observe("j5d_http_request_seconds", elapsed, route=route, method=request.method)
+    telemetry.inc("j5d_http_requests_total", route=route, method=request.method, status=response.status_code)
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profile_id = profiler.finish(profile, method=request.method, path=request.full_path.rstrip("?"),
+                                     route=route, status=response.status_code, ms=round(elapsed * 1000, 3))
+        response.headers["X-J5D-Profile"] = str(profile_id)
+    return response
+
+@app.teardown_request
+def _discard_profile(exc):
+    # Si la petición falló antes de after_request el perfilador queda libre igualmente
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profiler.discard(profile)
+
+def _gauge_containers():
+    counts = {}
+    for c in registry.list():
+        key = (("engine", c["engine"]), ("status", c["status"]))
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+def _gauge_store_bytes():
+    return {(("file", os.path.basename(path)),): os.path.getsize(path)
+            for path in (store.path, store.path + "-wal") if os.path.exists(path)}
+
+telemetry.gauge("j5d_containers", "Contenedores en el índice por motor y estado", _gauge_containers)
+telemetry.gauge("j5d_store_bytes", "Tamaño de la base de datos SQLite (y su WAL)", _gauge_store_bytes)
+telemetry.gauge("j5d_open_streams", "Streams abiertos con los daemons",
+                lambda: {(("kind", "logs"),): log_hub.count(), (("kind", "stats"),): metrics.stream_count()})
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(telemetry.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/profiling", methods=["GET", "POST"])
+def api_profiling():
+    # POST {"enabled": true, "prefix": "/api/data"} lo activa (solo para esas rutas); GET ?limit=N
+    if request.method == "POST":
+        req = request.json or {}
+        enabled, prefix = req.get("enabled", True), req.get("prefix")
+        if not isinstance(enabled, bool):
+            return jsonify({"error": "enabled debe ser true o false"}), 400
+        if prefix is not None and not isinstance(prefix, str):
+            return jsonify({"error": "prefix debe ser una ruta o null"}), 400
+        return jsonify(profiler.configure(enabled, prefix))
+    return jsonify({**profiler.status(), "recent": profiler.list(request.args.get("limit", 10, type=int))})
+
+
+# ==========================================
+# INTERFAZ WEB (Tailwind CSS + Vue.js)
+# ==========================================
+# La SPA vive en static/src; python3 build_assets.py la compila en static/dist
+# (Tailwind purgado, Vue de producción, ficheros con hash y precomprimidos).
+
+@app.route("/")
+def index():
+    # Solo entregamos la estructura HTML. Vue se encarga de rellenar los datos.
+    if assets.load_manifest() is None:
+        return assets.render_dev_index()
+    return assets.send_dist("index.html", max_age=0)
+
+@app.route("/assets/<path:filename>")
+def dist_asset(filename):
+    # Nombres con hash: se pueden cachear para siempre
+    return assets.send_dist(filename, max_age=assets.IMMUTABLE)
+
+
+# ==========================================
+# RUTAS API (Backend para Vue)
+# ==========================================
+
+@app.route("/api/data", methods=["GET"])
+def api_data():
+    # Se lee de los índices en memoria: ninguna llamada a los daemons por petición.
+    # Un motor que aún no respondió solo puede retrasar la página hasta ?budget=
+    registry.start(budget=request.args.get("budget", ENGINE_BUDGET, type=float))
+    # Versión = "<versión del store>.<versión de cada motor>"; se lee antes que
+    # los datos para que, si algo cambia entre medias, el siguiente delta lo incluya
+    version = f"{store.version()}.{registry.version()}"
+    # ?containers=0 deja fuera la lista de contenedores (la SPA la pagina con /api/containers)
+    with_containers = request.args.get("containers") != "0"
+    if request.if_none_match.contains(version):
+        telemetry.cache("api_data", "hit")
+        response = Response(status=304)
+    else:
+        payload = _data_delta(version, request.args.get("since"), with_containers)
+        telemetry.cache("api_data", "delta" if payload else "miss")
+        if payload is None:
+            payload = {"version": version, "delta": False, "engines": registry.statuses(), "data": load_data()}
+            if with_containers:
+                payload["containers"] = registry.list()
+        response = jsonify(payload)
+    response.set_etag(version)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def _data_delta(version, since, with_containers=True):
+    """Solo lo que cambió desde el cursor ?since=, o None si hace falta todo"""
+    try:
+        store_since, _, engines_since = since.partition(".")
+        store_changes = store.changes_since(int(store_since))
+        index_changes = registry.changes_since(engines_since) if with_containers else ([], [])
+    except (AttributeError, ValueError):
+        return None
+    if store_changes is None or index_changes is None:
+        return None
+    data, deleted = store_changes
+    payload = {"version": version, "delta": True, "engines": registry.statuses(), "data": data, "deleted": deleted}
+    if with_containers:
+        payload["containers"], deleted["containers"] = index_changes
+    return payload
+
+@app.route("/api/containers", methods=["GET"])
+def api_containers():
+    # ?status=running,exited &q=texto &prefix=web &project=p &engine=e
+    # &sort=name|status|engine|path (con "-" delante, descendente) &limit=100 &cursor=...
+    registry.start(budget=request.args.get("budget", ENGINE_BUDGET, type=float))
+    args = request.args
+    members = None
+    if args.get("project"):
+        project = store.get_project(args["project"])
+        if project is None:
+            return jsonify({"error": f"El proyecto '{args['project']}' no existe."}), 404
+        members = set(project)
+    try:
+        result = container_query.run(
+            status=[s for s in args.get("status", "").split(",") if s] or None,
+            q=args.get("q") or None,
+            prefix=args.get("prefix") or None,
+            engine=args.get("engine") or None,
+            members=members,
+            sort=args.get("sort", "name"),
+            limit=args.get("limit", DEFAULT_LIMIT, type=int),
+            cursor=args.get("cursor") or None,
+            # El total solo se calcula en la primera página
+            with_total=not args.get("cursor"),
+        )
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+@app.route("/api/stream")
+def api_stream():
+    # Server-Sent Events: contenedores, alias y proyectos que cambian
+    registry.start()
+    sub = feed.subscribe()
+    return Response(
+        feed.stream(sub),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/api/container/<action>/<name>", methods=["POST"])
+def api_container(action, name):
+    try:
+        c = _get_container(name)
+        if action == "start": c.start()
+        elif action == "stop": c.stop()
+        elif action == "pause": c.pause()
+        elif action == "unpause": c.unpause()
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+# --- Rutas API para Logs ---
+def _log_response(refs, prefix):
+    # ?tail=100|all &since=<unix>|30s|5m|2h &timestamps=1 &format=sse|text
+    try:
+        tail = parse_tail(request.args.get("tail"))
+        since = parse_since(request.args.get("since"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # El índice hace falta para saber cuándo vuelve a arrancar un contenedor parado
+    registry.start()
+    lines = log_hub.lines(refs, tail, since)
+    # EventSource pide text/event-stream; curl y compañía reciben texto plano por chunks
+    sse = request.args.get("format", "sse" if request.accept_mimetypes.best == "text/event-stream" else "text") == "sse"
+    if sse:
+        body, mimetype = format_sse(lines), "text/event-stream"
+    else:
+        body = format_text(lines, prefix=prefix, timestamps=request.args.get("timestamps") == "1")
+        mimetype = "text/plain; charset=utf-8"
+    return Response(body, mimetype=mimetype, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/api/logs/<name>", methods=["GET"])
+def api_logs(name):
+    try:
+        engine, _ = registry.resolve(name)
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    if engine.ready.is_set() and registry.get(name) is None:
+        return jsonify({"error": f"El contenedor '{name}' no existe."}), 404
+    return _log_response([name], prefix=False)
+
+@app.route("/api/project/logs/<project>", methods=["GET"])
+def api_project_logs(project):
+    # Las líneas de todos los contenedores en un único stream, con prefijo
+    members = store.get_project(project)
+    if members is None:
+        return jsonify({"error": f"El proyecto '{project}' no existe."}), 404
+    return _log_response(members, prefix=True)
+
+
+# --- Rutas API para Métricas ---
+def _start_metrics():
+    if not METRICS_ENABLED:
+        return False
+    registry.start()
+    metrics.start()
+    return True
+
+@app.route("/api/metrics", methods=["GET"])
+def api_metrics():
+    # Última muestra de cada contenedor: una sola petición para toda la tabla
+    if not _start_metrics():
+        return jsonify({"error": "Métricas desactivadas (J5D_METRICS=0)"}), 404
+    return jsonify({"tiers": metrics.tiers(), "containers": metrics.latest()})
+
+@app.route("/api/metrics/<name>", methods=["GET"])
+def api_container_metrics(name):
+    # ?tier=1s|1m|1h &points=N
+    if not _start_metrics():
+        return jsonify({"error": "Métricas desactivadas (J5D_METRICS=0)"}), 404
+    try:
+        result = metrics.container(name, request.args.get("tier", "1s"), request.args.get("points", type=int))
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 400
+    if result is None:
+        return jsonify({"error": f"Sin métricas para '{name}' (¿está en marcha?)"}), 404
+    return jsonify(result)
+
+@app.route("/api/project/metrics/<project>", methods=["GET"])
+def api_project_metrics(project):
+    # Suma de los contenedores del proyecto, alineada por intervalo
+    if not _start_metrics():
+        return jsonify({"error": "Métricas desactivadas (J5D_METRICS=0)"}), 404
+    members = store.get_project(project)
+    if members is None:
+        return jsonify({"error": f"El proyecto '{project}' no existe."}), 404
+    try:
+        result = metrics.project(members, request.args.get("tier", "1s"), request.args.get("points", type=int))
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 400
+    return jsonify({"project": project, **result})
+
+
+# --- Rutas API para Uso de Disco ---
+def _disk_usage():
+    # Arranca el índice con la primera petición y pide otra foto si la actual caducó
+    registry.start()
+    disk.start()
+    disk.ensure_fresh()
+    return disk
+
+@app.route("/api/disk", methods=["GET"])
+def api_disk():
+    # Estado de la foto de cada motor y los contenedores que más ocupan (?limit=N, 0 = todos)
+    usage = _disk_usage()
+    return jsonify({"engines": usage.status(), "containers": usage.containers(request.args.get("limit", DEFAULT_TOP, type=int))})
+
+@app.route("/api/disk/refresh", methods=["POST"])
+def api_disk_refresh():
+    # ?wait=<segundos> espera a que termine (como mucho ese tiempo); si no, responde al momento
+    registry.start()
+    disk.start()
+    wait = request.args.get("wait", 0, type=float)
+    if wait > 0:
+        disk.wait(wait)
+    else:
+        disk.refresh()
+    return jsonify({"engines": disk.status()}), 200 if wait > 0 else 202
+
+@app.route("/api/disk/<name>", methods=["GET"])
+def api_container_disk(name):
+    usage = _disk_usage()
+    try:
+        result = usage.container(name)
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 400
+    if result is None:
+        return jsonify({"error": f"Sin datos de disco para '{name}' (¿aún no se ha leído?)"}), 404
+    return jsonify(result)
+
+@app.route("/api/project/disk", methods=["GET"])
+def api_projects_disk():
+    # Totales de todos los proyectos: lo que necesita el dashboard en una sola petición
+    usage = _disk_usage()
+    return jsonify({project: usage.project(members)["totals"] for project, members in store.projects().items()})
+
+@app.route("/api/project/disk/<project>", methods=["GET"])
+def api_project_disk(project):
+    members = store.get_project(project)
+    if members is None:
+        return jsonify({"error": f"El proyecto '{project}' no existe."}), 404
+    return jsonify({"project": project, **_disk_usage().project(members)})
+
+
+# --- Rutas API para Alias ---
+@app.route("/api/alias/add", methods=["POST"])
+def api_alias_add():
+    req = request.json
+    store.set_alias(req["alias"], req["container"])
+    feed.publish("alias", {"alias": req["alias"], "container": req["container"]})
+    return jsonify({"success": True})
+
+@app.route("/api/alias/<action>/<alias>", methods=["POST"])
+def api_alias_action(action, alias):
+    container_name = store.get_alias(alias)
+    if container_name is not None:
+        try:
+            if action == "delete":
+                store.delete_alias(alias)
+                feed.publish("alias", {"alias": alias, "deleted": True})
+            else:
+                c = _get_container(container_name)
+                if action == "start": c.start()
+                elif action == "stop": c.stop()
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True})
+
+
+# --- Rutas API para Proyectos ---
+@app.route("/api/project/add", methods=["POST"])
+def api_project_add():
+    req = request.json
+    p = req["project"]
+    c = req["container"]
+    members = store.add_to_project(p, c)
+    feed.publish("project", {"project": p, "containers": members})
+    return jsonify({"success": True})
+
+@app.route("/api/project/<action>/<project>", methods=["POST"])
+def api_project_action(action, project):
+    members = store.get_project(project)
+    if members is None:
+        return jsonify({"error": f"El proyecto '{project}' no existe."}), 404
+    if action == "delete":
+        store.delete_project(project)
+        feed.publish("project", {"project": project, "deleted": True})
+        return jsonify({"success": True})
+    if action not in ACTIONS + ("suspend", "resume"):
+        return jsonify({"error": f"Acción desconocida: {action}"}), 400
+
+    # Lo mismo que los comandos j5d: cada motor en paralelo con su propio pool,
+    # por oleadas si hay dependencias, y suspend/resume con pause/unpause
+    message = {
+        "command": action,
+        "project": project,
+        "concurrency": request.args.get("concurrency", type=int),
+        "timeout": request.args.get("timeout", type=int),
+    }
+    reply = _project_command(message, lambda m: None)
+    if reply["type"] == "error":
+        return jsonify({"error": reply["message"]}), 400
+    results = reply["results"]
+    return jsonify({
+        "success": all(r["ok"] for r in results),
+        "results": results,
+        "state": store.project_state(project),
+        "resume_ms": reply.get("resume_ms"),
+    })
+
+@app.route("/api/project/states", methods=["GET"])
+def api_project_states():
+    # Proyectos suspendidos, qué se pausó y cuánto tardó la última reanudación
+    return jsonify(store.project_states())
+
+@app.route("/api/project/config/<project>", methods=["GET", "POST"])
+def api_project_config(project):
+    # Body: {"depends_on": {"web": ["db"]}, "start_timeout": 120, "stop_timeout": 20}
+    # Solo se cambia lo que venga; un timeout a null vuelve al valor por defecto
+    members = store.get_project(project)
+    if members is None:
+        return jsonify({"error": f"El proyecto '{project}' no existe."}), 404
+    if request.method == "GET":
+        config = store.project_config(project)
+        return jsonify({"project": project, **config, "waves": plan_waves(members, config["depends_on"])})
+    req = request.json or {}
+    changes = {}
+    if "depends_on" in req:
+        depends_on = req["depends_on"] or {}
+        if not isinstance(depends_on, dict) or not all(
+            isinstance(deps, list) and all(isinstance(d, str) for d in deps) for deps in depends_on.values()
+        ):
+            return jsonify({"error": "depends_on debe ser un objeto {contenedor: [dependencias]}"}), 400
+        for container, deps in depends_on.items():
+            unknown = [c for c in [container, *deps] if c not in members]
+            if unknown:
+                return jsonify({"error": f"No son del proyecto: {', '.join(unknown)}"}), 400
+        try:
+            plan_waves(members, depends_on)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        changes["depends_on"] = depends_on
+    # Docker solo acepta segundos enteros para parar (?t=); la espera de arranque es nuestra
+    for key, types, kind in (("start_timeout", (int, float), "un número"), ("stop_timeout", int, "un entero")):
+        if key in req:
+            value = req[key]
+            if value is not None and (not isinstance(value, types) or isinstance(value, bool) or value <= 0):
+                return jsonify({"error": f"{key} debe ser {kind} positivo o null"}), 400
+            changes[key] = value
+    config = store.set_project_config(project, **changes)
+    return jsonify({"success": True, "project": project, **config, "waves": plan_waves(members, config["depends_on"])})
+
+
+# --- Rutas API para el apagado automático ---
+@app.route("/api/project/idle/<project>", methods=["GET", "POST", "DELETE"])
+def api_project_idle(project):
+    # Body: {"action": "stop"|"suspend", "scope": "project"|"containers",
+    #        "idle_minutes": 30, "cpu_below": 2, "net_below": 1024, "ttl_minutes": 480, "dry_run": true}
+    if store.get_project(project) is None:
+        return jsonify({"error": f"El proyecto '{project}' no existe."}), 404
+    if request.method == "GET":
+        return jsonify({"project": project, "policy": store.idle_policy(project)})
+    if request.method == "DELETE":
+        store.delete_idle_policy(project)
+        return jsonify({"success": True})
+    try:
+        policy = validate_policy(request.json or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    store.set_idle_policy(project, policy)
+    response = {"success": True, "project": project, "policy": policy}
+    if policy["idle_minutes"] and not METRICS_ENABLED:
+        response["warning"] = "Las métricas están desactivadas (J5D_METRICS=0): solo se aplicará el TTL"
+    return jsonify(response)
+
+@app.route("/api/idle/actions", methods=["GET"])
+def api_idle_actions():
+    # Registro de lo que hizo (o habría hecho, en dry run) el apagado automático
+    return jsonify(store.idle_actions(
+        limit=min(request.args.get("limit", 100, type=int), 1000),
+        project=request.args.get("project") or None,
+    ))
+
+@app.route("/api/idle/check", methods=["POST"])
+def api_idle_check():
+    # Revisión inmediata, sin esperar al siguiente ciclo (ni a un motor más de ?budget=)
+    registry.start(budget=request.args.get("budget", ENGINE_BUDGET, type=float))
+    idle.start()
+    return jsonify({"actions": idle.check()})
+
+def _idle_action(action, project, containers):
+    """Lo que ejecuta el apagado automático: el proyecto entero o solo algunos contenedores"""
+    if containers is None:
+        reply = _project_command({"command": action, "project": project}, lambda m: None)
+        if reply["type"] == "error":
+            raise RuntimeError(reply["message"])
+        return reply["results"]
+    results = run_project_action(registry, containers, "pause" if action == "suspend" else "stop")
+    paused = [r["container"] for r in results if r["ok"]]
+    if action == "suspend" and paused:
+        # Se suman a lo suspendido del proyecto para que resume también los despierte
+        state = store.project_state(project)
+        store.set_suspended(project, state["containers"] + [c for c in paused if c not in state["containers"]])
+        feed.publish("project_state", {"project": project, **store.project_state(project)})
+    return results
+
+# Detiene o suspende lo que lleve inactivo según la política de cada proyecto
+idle = IdleScheduler(registry, store, metrics, _idle_action)
+
+
+# --- Rutas API para lotes de operaciones ---
+# Acciones permitidas en /api/batch según el tipo de objetivo
+BATCH_ACTIONS = {
+    "container": ACTIONS + ("pause", "unpause"),
+    "alias": ACTIONS,
+    "project": ACTIONS + ("suspend", "resume"),
+}
+MAX_BATCH = 1000
+
+def _batch_item(item):
+    """Ejecuta una operación de un lote (en el pool compartido de jobs)"""
+    kind, name, action = item["kind"], item["name"], item["action"]
+    if kind == "project":
+        reply = _project_command({"command": action, "project": name}, lambda m: None)
+        if reply["type"] == "error":
+            raise RuntimeError(reply["message"])
+        failed = [f"{r['container']}: {r['error']}" for r in reply["results"] if not r["ok"]]
+        return {"results": reply["results"], "error": "; ".join(failed) or None}
+    ref = name
+    if kind == "alias":
+        ref = store.get_alias(name)
+        if ref is None:
+            raise RuntimeError(f"El alias '{name}' no existe.")
+    try:
+        engine, container = registry.resolve(ref)
+    except KeyError as e:
+        raise RuntimeError(e.args[0])
+    container_action(engine.client, container, action)
+    return {"container": ref} if kind == "alias" else {}
+
+jobs = JobManager(_batch_item, on_update=lambda job, item: feed.publish("job", {**job, "item": item}))
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    # Body: {"operations": [{"kind": "container"|"alias"|"project", "name": "web", "action": "stop"}, ...]}
+    # Responde al momento con el id del job; el progreso en /api/jobs/<id> y por SSE (evento "job")
+    operations = (request.json or {}).get("operations")
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "Indica una lista de operaciones en 'operations'"}), 400
+    if len(operations) > MAX_BATCH:
+        return jsonify({"error": f"Como mucho {MAX_BATCH} operaciones por lote"}), 400
+    items = []
+    for i, op in enumerate(operations):
+        kind, name, action = (op.get(k) if isinstance(op, dict) else None for k in ("kind", "name", "action"))
+        if kind not in BATCH_ACTIONS or not isinstance(name, str) or not name:
+            return jsonify({"error": f"Operación {i}: indica kind ({', '.join(BATCH_ACTIONS)}) y name"}), 400
+        if action not in BATCH_ACTIONS[kind]:
+            return jsonify({"error": f"Operación {i}: acción no válida para {kind}: {action}"}), 400
+        items.append({"kind": kind, "name": name, "action": action})
+    job = jobs.submit(items)
+    return jsonify({"job": job.id, "total": len(items)}), 202
+
+@app.route("/api/jobs", methods=["GET"])
+def api_jobs():
+    return jsonify(jobs.list())
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def api_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"El job '{job_id}' no existe (o ya se olvidó)."}), 404
+    return jsonify(job)
+
+
+# ==========================================
+# SOCKET DE CONTROL (comandos j5d delegados)
+# ==========================================
+def _project_command(message, emit):
+    reply = project_command(message, emit, registry, store)
+    if reply["type"] == "done":
+        # La suspensión del proyecto puede haber cambiado: el dashboard lo muestra
+        feed.publish("project_state", {"project": message["project"], **store.project_state(message["project"])})
+    return reply
+
+def _stats_command(message, emit):
+    # "j5d-stats": los contadores viven en el proceso del servidor
+    return {"type": "done", "stats": telemetry.summary(), "profiling": profiler.status()}
+
+CONTROL_COMMANDS = {command: _project_command for command in COMMANDS}
+CONTROL_COMMANDS["stats"] = _stats_command
+
+
+def serve(host="0.0.0.0", port=5555):
+    registry.start(budget=ENGINE_BUDGET)
+    if METRICS_ENABLED:
+        metrics.start()
+    idle.start()
+    disk.start()
+    try:
+        control = ControlServer(CONTROL_COMMANDS)
+        control.start()
+    except (OSError, RuntimeError) as e:
+        control = None
+        print(f"⚠️  Socket de control desactivado: {e}")
+    try:
+        app.run(host=host, port=port)
+    finally:
+        if control:
+            control.close()